@@ -0,0 +1,79 @@
+"""add course search vector
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b8c9d0e1f2'
+down_revision: Union[str, Sequence[str], None] = 'f6a7b8c9d0e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # PostgreSQL only: other databases use the substring fallback in course_service.search_courses
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    op.execute('ALTER TABLE courses ADD COLUMN search_vector tsvector')
+    
+    # The vector includes the department name, which a generated column cannot
+    # reference, so it is maintained by triggers on both tables
+    op.execute("""
+        CREATE FUNCTION courses_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('simple', coalesce(NEW.code, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(NEW.name, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(
+                    (SELECT name FROM departments WHERE id = NEW.department_id), ''
+                )), 'C');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER courses_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF code, name, department_id ON courses
+        FOR EACH ROW EXECUTE FUNCTION courses_search_vector_update()
+    """)
+    op.execute("""
+        CREATE FUNCTION departments_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            UPDATE courses SET name = name WHERE department_id = NEW.id;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER departments_search_vector_trigger
+        AFTER UPDATE OF name ON departments
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION departments_search_vector_update()
+    """)
+    
+    # Backfill existing rows through the trigger
+    op.execute('UPDATE courses SET name = name')
+    op.create_index('ix_courses_search_vector', 'courses', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    op.drop_index('ix_courses_search_vector', table_name='courses')
+    op.execute('DROP TRIGGER departments_search_vector_trigger ON departments')
+    op.execute('DROP FUNCTION departments_search_vector_update()')
+    op.execute('DROP TRIGGER courses_search_vector_trigger ON courses')
+    op.execute('DROP FUNCTION courses_search_vector_update()')
+    op.drop_column('courses', 'search_vector')
@@ -0,0 +1,36 @@
+"""add course enrolled count
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d0e1f2a3b4'
+down_revision: Union[str, Sequence[str], None] = 'b8c9d0e1f2a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('courses', sa.Column('enrolled_count', sa.Integer(), server_default='0', nullable=False))
+    
+    # Backfill from the active enrollments
+    op.execute("""
+        UPDATE courses SET enrolled_count = (
+            SELECT COUNT(*) FROM enrollments
+            WHERE enrollments.course_id = courses.id AND enrollments.status = 'enrolled'
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('courses', 'enrolled_count')
@@ -0,0 +1,42 @@
+"""add keyset pagination indexes
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f6a7b8c9d0'
+down_revision: Union[str, Sequence[str], None] = 'd4e5f6a7b8c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # (sort column, id) indexes let cursor pages seek directly to their first row
+    op.create_index('ix_courses_name_id', 'courses', ['name', 'id'], unique=False)
+    op.create_index('ix_courses_code_id', 'courses', ['code', 'id'], unique=False)
+    op.create_index('ix_courses_credits_id', 'courses', ['credits', 'id'], unique=False)
+    op.create_index('ix_courses_semester_id', 'courses', ['semester', 'id'], unique=False)
+    
+    op.create_index('ix_students_name_id', 'students', ['name', 'id'], unique=False)
+    op.create_index('ix_students_email_id', 'students', ['email', 'id'], unique=False)
+    op.create_index('ix_students_student_number_id', 'students', ['student_number', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_students_student_number_id', table_name='students')
+    op.drop_index('ix_students_email_id', table_name='students')
+    op.drop_index('ix_students_name_id', table_name='students')
+    op.drop_index('ix_courses_semester_id', table_name='courses')
+    op.drop_index('ix_courses_credits_id', table_name='courses')
+    op.drop_index('ix_courses_code_id', table_name='courses')
+    op.drop_index('ix_courses_name_id', table_name='courses')
@@ -0,0 +1,52 @@
+"""add prerequisite closure table
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-16 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a3b4c5d6e7'
+down_revision: Union[str, Sequence[str], None] = 'e1f2a3b4c5d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('course_prerequisite_closure',
+    sa.Column('descendant_id', sa.Integer(), nullable=False),
+    sa.Column('ancestor_id', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['courses.id'], ),
+    sa.ForeignKeyConstraint(['descendant_id'], ['courses.id'], ),
+    sa.PrimaryKeyConstraint('descendant_id', 'ancestor_id')
+    )
+    op.create_index('ix_course_prerequisite_closure_ancestor', 'course_prerequisite_closure', ['ancestor_id'], unique=False)
+    
+    # Populate from the existing edges, keeping the shortest chain per pair
+    op.execute("""
+        INSERT INTO course_prerequisite_closure (descendant_id, ancestor_id, depth)
+        WITH RECURSIVE closure (descendant_id, ancestor_id, depth) AS (
+            SELECT course_id, prerequisite_id, 1 FROM course_prerequisites
+            UNION
+            SELECT closure.descendant_id, course_prerequisites.prerequisite_id, closure.depth + 1
+            FROM closure
+            JOIN course_prerequisites ON course_prerequisites.course_id = closure.ancestor_id
+            WHERE closure.depth < 100
+        )
+        SELECT descendant_id, ancestor_id, MIN(depth) FROM closure
+        GROUP BY descendant_id, ancestor_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_course_prerequisite_closure_ancestor', table_name='course_prerequisite_closure')
+    op.drop_table('course_prerequisite_closure')
@@ -0,0 +1,68 @@
+"""add trigram search indexes
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a7b8c9d0e1'
+down_revision: Union[str, Sequence[str], None] = 'e5f6a7b8c9d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic")
+
+# (index name, table, column) for every column searched with ILIKE '%term%'
+TRIGRAM_INDEXES = [
+    ('ix_courses_code_trgm', 'courses', 'code'),
+    ('ix_courses_name_trgm', 'courses', 'name'),
+    ('ix_students_name_trgm', 'students', 'name'),
+    ('ix_students_email_trgm', 'students', 'email'),
+    ('ix_students_student_number_trgm', 'students', 'student_number'),
+]
+
+
+def _pg_trgm_available() -> bool:
+    """Trigram indexes need PostgreSQL with the pg_trgm extension installable."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return False
+    if context.is_offline_mode():
+        return True  # Generating SQL for a PostgreSQL target; assume the extension exists
+    return bind.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar() is not None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # B-tree indexes cannot serve leading-wildcard patterns; GIN trigram indexes can.
+    # Other databases keep working with a sequential scan.
+    if not _pg_trgm_available():
+        logger.warning("pg_trgm is not available; skipping trigram search indexes")
+        return
+    
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            name, table, [column], unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'}
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    for name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.execute(f'DROP INDEX IF EXISTS {name}')
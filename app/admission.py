@@ -0,0 +1,89 @@
+"""
+Enrollment admission batching
+
+With ENROLLMENT_BATCHING enabled, enrollment requests are not committed one
+by one. Requests for the same course that arrive within a short window are
+collected and handed to enrollment_service.create_enrollments, which
+validates them with one query per rule and commits them in one transaction;
+each waiting request then receives its own result.
+"""
+import asyncio
+
+from app.config import get_settings
+from app.database import run_in_session, session_scope
+from app.schemas.enrollment import EnrollmentCreate, EnrollmentResponse
+from app.services import enrollment_service
+
+# Get settings
+settings = get_settings()
+
+
+class AdmissionQueue:
+    """Per-course queues of pending enrollments, flushed as batches."""
+
+    def __init__(self, window_seconds: float, max_batch_size: int):
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self._pending: dict[int, list[tuple[EnrollmentCreate, asyncio.Future]]] = {}
+        self._timers: dict[int, asyncio.TimerHandle] = {}
+        self._flushes: set[asyncio.Task] = set()
+
+    async def submit(self, enrollment: EnrollmentCreate) -> EnrollmentResponse:
+        """
+        Queue an enrollment and wait for its batch to commit.
+        
+        Raises the request's own HTTPException if it was rejected.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        course_id = enrollment.course_id
+        
+        batch = self._pending.setdefault(course_id, [])
+        batch.append((enrollment, future))
+        if len(batch) >= self.max_batch_size:
+            self._flush(course_id)
+        elif len(batch) == 1:
+            # The first request in a batch opens the window
+            self._timers[course_id] = loop.call_later(self.window_seconds, self._flush, course_id)
+        
+        return await future
+
+    def _flush(self, course_id: int) -> None:
+        timer = self._timers.pop(course_id, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(course_id, None)
+        if not batch:
+            return
+        
+        # Keep a reference so the task is not garbage collected mid-flight
+        task = asyncio.get_running_loop().create_task(self._commit(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _commit(self, batch: list[tuple[EnrollmentCreate, asyncio.Future]]) -> None:
+        try:
+            async with session_scope() as db:
+                results = await run_in_session(
+                    db, enrollment_service.create_enrollments, [enrollment for enrollment, _ in batch]
+                )
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        
+        for (_, future), result in zip(batch, results):
+            # A caller that disconnected has a cancelled future; its enrollment still stands
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+admission_queue = AdmissionQueue(
+    window_seconds=settings.enrollment_batch_window_ms / 1000,
+    max_batch_size=settings.enrollment_batch_max_size,
+)
@@ -0,0 +1,179 @@
+"""
+In-memory prefix index for course autocomplete
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+
+from sqlalchemy.orm import Session
+
+from app.cache_versions import read_version
+from app.config import get_settings
+from app.models.course import Course
+from app.search import search_terms
+
+# Get settings
+settings = get_settings()
+
+# cache_versions row bumped by every course create, update and delete
+COURSES_VERSION_NAME = "courses"
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    """A course as stored in the autocomplete index."""
+    
+    id: int
+    code: str
+    name: str
+
+
+class AutocompleteIndex:
+    """
+    Sorted array of (token, course id) pairs over course codes and name words.
+    
+    A prefix lookup is a binary search to the first token >= prefix followed
+    by a scan while tokens still start with it, so lookups never touch the
+    database. Each worker process holds its own copy, built at startup and
+    stamped with the version of the "courses" row in cache_versions it was
+    loaded at. The worker that changes a course applies the change in place;
+    other workers notice the bumped version and rebuild, checking at most
+    once per `check_interval` seconds.
+    """
+
+    def __init__(self, check_interval: float = 1.0):
+        self.check_interval = check_interval
+        self.version: int | None = None
+        self._checked_at = 0.0
+        self._courses: dict[int, Suggestion] = {}
+        self._compact_codes: dict[int, str] = {}
+        self._keys: list[tuple[str, int]] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _compact_code(code: str) -> str:
+        return "".join(search_terms(code))
+
+    @classmethod
+    def _tokens(cls, course: Suggestion) -> set[str]:
+        return {cls._compact_code(course.code), *search_terms(course.code), *search_terms(course.name)}
+
+    def build(self, courses, version: int) -> None:
+        """Replace the index contents with the given courses."""
+        entries = {course.id: Suggestion(course.id, course.code, course.name) for course in courses}
+        keys = sorted((token, entry.id) for entry in entries.values() for token in self._tokens(entry))
+        compact_codes = {entry.id: self._compact_code(entry.code) for entry in entries.values()}
+        with self._lock:
+            # A load that raced with a newer in-place change must not roll it back
+            if self.version is not None and version < self.version:
+                return
+            self._courses = entries
+            self._compact_codes = compact_codes
+            self._keys = keys
+            self.version = version
+            self._checked_at = time.monotonic()
+
+    def add(self, course, version: int) -> None:
+        """Apply a committed insert, or re-index a course whose code or name changed."""
+        entry = Suggestion(course.id, course.code, course.name)
+        with self._lock:
+            self._advance(version)
+            if self._courses.get(entry.id) == entry:
+                return
+            self._remove(entry.id)
+            self._courses[entry.id] = entry
+            self._compact_codes[entry.id] = self._compact_code(entry.code)
+            for token in self._tokens(entry):
+                insort(self._keys, (token, entry.id))
+
+    def remove(self, course_id: int, version: int) -> None:
+        """Apply a committed delete (idempotent)."""
+        with self._lock:
+            self._remove(course_id)
+            self._advance(version)
+
+    def _advance(self, version: int) -> None:
+        if self.version is not None:
+            self.version = max(self.version, version)
+
+    def ensure_fresh(self, db: Session) -> None:
+        """Rebuild from the database if another worker changed a course since the index was loaded."""
+        # Database reads happen outside the lock, as in PrerequisiteGraph.ensure_fresh
+        if self.version is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return
+        version = read_version(db, COURSES_VERSION_NAME)
+        # A lagging replica can report an older version than this copy has seen
+        if self.version is None or version > self.version:
+            self.load(db, version)
+        else:
+            self._checked_at = time.monotonic()
+
+    def sync(self, db: Session, version: int) -> None:
+        """
+        Make sure the index reflects the given version, rebuilding if it does not.
+        
+        Writers call this after bumping the "courses" version with the
+        version preceding their own, while holding the version row lock.
+        """
+        if version != self.version:
+            self.load(db, version)
+
+    def load(self, db: Session, version: int | None = None) -> None:
+        """Index every course in the database (at the given version, or the current one)."""
+        if version is None:
+            version = read_version(db, COURSES_VERSION_NAME)
+        self.build(db.query(Course.id, Course.code, Course.name).all(), version)
+
+    def _remove(self, course_id: int) -> None:
+        entry = self._courses.pop(course_id, None)
+        if entry is None:
+            return
+        del self._compact_codes[course_id]
+        for token in self._tokens(entry):
+            index = bisect_left(self._keys, (token, course_id))
+            if index < len(self._keys) and self._keys[index] == (token, course_id):
+                del self._keys[index]
+
+    def _prefix_ids(self, prefix: str) -> set[int]:
+        ids = set()
+        index = bisect_left(self._keys, (prefix, -1))
+        while index < len(self._keys) and self._keys[index][0].startswith(prefix):
+            ids.add(self._keys[index][1])
+            index += 1
+        return ids
+
+    def lookup(self, text: str, limit: int = 10) -> list[Suggestion]:
+        """
+        Return courses where every word of text prefixes some code or name token.
+        
+        Courses whose code starts with the text come first, then by code.
+        """
+        terms = search_terms(text)
+        if not terms:
+            return []
+        
+        compact = "".join(terms)
+        with self._lock:
+            # "CMPE 2" should still find CMPE201, so try the joined text against codes as well
+            ids = self._prefix_ids(compact) if len(terms) > 1 else set()
+            matches = None
+            for term in sorted(terms, key=len, reverse=True):
+                term_ids = self._prefix_ids(term)
+                matches = term_ids if matches is None else matches & term_ids
+                if not matches:
+                    break
+            ids |= matches
+            
+            codes = self._compact_codes
+            best = heapq.nsmallest(
+                limit, ids, key=lambda course_id: (not codes[course_id].startswith(compact), codes[course_id], course_id)
+            )
+            return [self._courses[course_id] for course_id in best]
+
+    def __len__(self) -> int:
+        return len(self._courses)
+
+
+course_index = AutocompleteIndex(check_interval=settings.autocomplete_index_check_seconds)
@@ -0,0 +1,142 @@
+"""
+In-process fan-out of seat availability changes
+
+Write paths record each course whose enrolled_count (or capacity) changed on
+the session with record_seat_change. Once the transaction commits, the
+courses' cached availability is invalidated and the changes are published to
+every subscriber of those courses; a rollback discards them. Subscribers and
+cache readers only ever see committed state.
+"""
+import asyncio
+from typing import Iterable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.cache import create_cache
+from app.config import get_settings
+
+# Get settings
+settings = get_settings()
+
+SEAT_CHANGES_KEY = "seat_changes"
+
+# course_id -> availability dict, read by enrollment_service.get_course_availability
+availability_cache = create_cache(
+    maxsize=settings.availability_cache_size,
+    ttl=settings.availability_cache_ttl_seconds,
+    url=settings.availability_cache_url,
+    prefix="availability:"
+)
+
+
+class Subscription:
+    """
+    One client's interest in a set of courses.
+    
+    Only the latest state per course is kept, so a slow client receives the
+    current counts rather than a backlog of intermediate ones, and an idle
+    subscription holds nothing but an unset Event.
+    """
+
+    def __init__(self, course_ids: Iterable[int]):
+        self.course_ids = frozenset(course_ids)
+        self._pending: dict[int, dict] = {}
+        self._event = asyncio.Event()
+
+    def push(self, availability: dict) -> None:
+        self._pending[availability["course_id"]] = availability
+        self._event.set()
+
+    async def wait(self) -> list[dict]:
+        """Wait for at least one change, then return all pending changes."""
+        await self._event.wait()
+        self._event.clear()
+        changes = list(self._pending.values())
+        self._pending.clear()
+        return changes
+
+
+class AvailabilityBroadcaster:
+    """Routes published availability changes to the subscriptions for each course."""
+
+    def __init__(self):
+        self._subscriptions: dict[int, set[Subscription]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def subscribe(self, course_ids: Iterable[int]) -> Subscription:
+        """Register a subscription. Must be called from the event loop."""
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(course_ids)
+        for course_id in subscription.course_ids:
+            self._subscriptions.setdefault(course_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription. Must be called from the event loop."""
+        for course_id in subscription.course_ids:
+            subscribers = self._subscriptions.get(course_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[course_id]
+
+    @property
+    def subscriber_count(self) -> int:
+        return len({s for subscribers in self._subscriptions.values() for s in subscribers})
+
+    def publish(self, changes: list[dict]) -> None:
+        """
+        Deliver availability changes to their subscribers.
+        
+        Safe to call from any thread: the fan-out itself is scheduled on the
+        event loop that owns the subscriptions.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed() or not any(c["course_id"] in self._subscriptions for c in changes):
+            return
+        loop.call_soon_threadsafe(self._fan_out, changes)
+
+    def _fan_out(self, changes: list[dict]) -> None:
+        for availability in changes:
+            for subscription in self._subscriptions.get(availability["course_id"], ()):
+                subscription.push(availability)
+
+
+availability_broadcaster = AvailabilityBroadcaster()
+
+
+def availability_event(course_id: int, enrolled_count: int, max_students: int) -> dict:
+    """Build the payload published for one course."""
+    return {
+        "course_id": course_id,
+        "enrolled_count": enrolled_count,
+        "max_students": max_students,
+        "available_seats": max_students - enrolled_count,
+    }
+
+
+def record_seat_change(db: Session, course_id: int, enrolled_count: int, max_students: int) -> None:
+    """Note a course's new seat counts, to be published when the session commits."""
+    db.info.setdefault(SEAT_CHANGES_KEY, {})[course_id] = (enrolled_count, max_students)
+
+
+@event.listens_for(Session, "after_commit")
+def _on_seat_change(session: Session) -> None:
+    """Invalidate and publish the seat changes of a committed transaction (the single post-commit hook for seat changes)."""
+    changes = session.info.pop(SEAT_CHANGES_KEY, None)
+    if not changes:
+        return
+    # Invalidate rather than write through: hooks of concurrent commits can
+    # run out of order, and a late write would pin an older count
+    for course_id in changes:
+        availability_cache.delete(course_id)
+    availability_broadcaster.publish([
+        availability_event(course_id, enrolled_count, max_students)
+        for course_id, (enrolled_count, max_students) in changes.items()
+    ])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_seat_changes(session: Session) -> None:
+    session.info.pop(SEAT_CHANGES_KEY, None)
@@ -0,0 +1,167 @@
+"""
+Small caches shared by the service layer
+
+TTLCache keeps entries in-process. RedisCache offers the same interface over
+a Redis server so several workers share one set of entries; it needs the
+optional `redis` package.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a fixed time-to-live.
+    
+    The cache is bounded: once `maxsize` entries are stored, the least
+    recently used entry is evicted. Hit and miss counters are kept for
+    monitoring.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a key from the cache if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Return size and hit/miss counters."""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class RedisCache:
+    """
+    Cache with the TTLCache interface whose entries live in Redis.
+    
+    Values must be JSON-serialisable. Entries expire after `ttl` seconds and
+    the size is bounded by the server's maxmemory with an LRU eviction policy
+    (e.g. allkeys-lru). Redis errors are treated as misses, so an unavailable
+    server degrades to reading through to the database. Hit and miss counters
+    are kept per process.
+    """
+
+    def __init__(self, url: str, prefix: str, ttl: float = 60.0):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "A Redis cache URL is configured but the 'redis' package is not installed "
+                "(pip install -r requirements-redis.txt)"
+            ) from exc
+        
+        self.prefix = prefix
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._error_class = redis.RedisError
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.prefix}{key}"
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing, expired or unreachable."""
+        try:
+            raw = self._client.get(self._key(key))
+        except self._error_class:
+            self.errors += 1
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return default
+        
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value with the cache's time-to-live."""
+        try:
+            self._client.set(self._key(key), json.dumps(value), px=int(self.ttl * 1000))
+        except self._error_class:
+            self.errors += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a key from the cache if present."""
+        try:
+            self._client.delete(self._key(key))
+        except self._error_class:
+            self.errors += 1
+
+    def clear(self) -> None:
+        """Remove all entries under this cache's prefix."""
+        try:
+            keys = list(self._client.scan_iter(match=f"{self.prefix}*", count=1000))
+            if keys:
+                self._client.delete(*keys)
+        except self._error_class:
+            self.errors += 1
+
+    def stats(self) -> dict:
+        """Return size (entries under the prefix) and this process's hit/miss counters."""
+        try:
+            size = sum(1 for _ in self._client.scan_iter(match=f"{self.prefix}*", count=1000))
+        except self._error_class:
+            self.errors += 1
+            size = None
+        return {
+            "size": size,
+            "maxsize": None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+def create_cache(maxsize: int, ttl: float, url: str | None = None, prefix: str = "") -> TTLCache | RedisCache:
+    """Return a RedisCache when a Redis URL is given, otherwise an in-process TTLCache."""
+    if url:
+        return RedisCache(url, prefix=prefix, ttl=ttl)
+    return TTLCache(maxsize=maxsize, ttl=ttl)
@@ -0,0 +1,37 @@
+"""
+Version stamps for data sets that workers cache in memory
+
+Each cached data set has a row in cache_versions. Writers bump it in the same
+transaction as their change; workers compare it with the version they loaded
+to tell when to reload.
+"""
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.cache_version import CacheVersion
+
+
+def read_version(db: Session, name: str) -> int:
+    """Return the current version of a data set (0 if never bumped)."""
+    version = db.query(CacheVersion.version).filter(CacheVersion.name == name).scalar()
+    return version or 0
+
+
+def bump_version(db: Session, name: str) -> int:
+    """
+    Increment a data set's version in the current transaction and return it.
+    
+    The UPDATE locks the version row until commit, which also serializes
+    concurrent writers of the same data set.
+    """
+    version = db.execute(
+        update(CacheVersion)
+        .where(CacheVersion.name == name)
+        .values(version=CacheVersion.version + 1)
+        .returning(CacheVersion.version)
+    ).scalar()
+    if version is None:
+        db.add(CacheVersion(name=name, version=1))
+        db.flush()
+        version = 1
+    return version
@@ -2,6 +2,8 @@
 Application configuration using Pydantic Settings
 """
 import os
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -9,6 +11,58 @@ class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
     
     database_url: str | None = None
+    # Async mode: serve requests through an AsyncEngine (asyncpg) instead of the threadpool
+    async_database: bool = False
+    async_database_url: str | None = None  # Derived from database_url when not set
+    
+    # Connection pool (ignored for SQLite)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30  # Seconds to wait for a connection before failing
+    db_pool_recycle: int = 1800  # Seconds before a connection is replaced; -1 disables
+    db_pool_pre_ping: bool = True  # Test connections on checkout to discard stale ones
+    db_pgbouncer: bool = False  # PgBouncer transaction mode: no server-side prepared statements
+    
+    # Read replicas: comma-separated URLs used by read-only GET routes
+    database_replica_urls: str | None = None
+    replica_retry_seconds: int = 30  # How long a failed replica is skipped
+    replica_stickiness_seconds: int = 5  # Reads go to the primary this long after a client writes
+    replica_stickiness_cache_size: int = 10000  # Users whose last write time is remembered
+    replica_stickiness_cache_url: str | None = None  # redis:// URL to share it between workers
+    
+    # Paginated totals: counts reused by total_mode=estimated
+    count_cache_size: int = 1024
+    count_cache_ttl_seconds: int = 30
+    
+    # Course autocomplete: each worker's in-memory index checks this often
+    # whether another worker created, renamed or deleted a course
+    autocomplete_index_check_seconds: float = 1.0
+    
+    # Enrollment admission batching: concurrent enrollments in one course are
+    # validated and committed together in a single transaction
+    enrollment_batching: bool = False
+    enrollment_batch_window_ms: float = 5.0  # How long the first request waits for others
+    enrollment_batch_max_size: int = 100  # A full batch is committed without waiting
+    
+    # Seat availability cache, invalidated when a seat change commits. Set
+    # availability_cache_url (redis://...) to share it between workers
+    availability_cache_size: int = 4096
+    availability_cache_ttl_seconds: int = 10
+    availability_cache_url: str | None = None
+    
+    # Prerequisite graph: "memory" keeps the edges in each worker and checks
+    # this often whether another worker changed them; "sql" holds nothing and
+    # runs one recursive CTE query per traversal; "closure" reads the
+    # materialized course_prerequisite_closure table
+    prerequisite_graph_backend: Literal["memory", "sql", "closure"] = "memory"
+    prerequisite_graph_check_seconds: float = 1.0
+    
+    # Batch seat availability
+    availability_batch_max_courses: int = 200  # Course ids one batch availability request may ask for
+    
+    # Seat availability stream (Server-Sent Events)
+    availability_stream_max_courses: int = 100  # Course ids one subscription may watch
+    availability_stream_keepalive_seconds: int = 15  # Comment sent on idle streams to keep proxies open
     debug: bool = False
     secret_key: str = "your-secret-key-change-in-production-min-32-characters-long"
     algorithm: str = "HS256"
@@ -17,6 +71,10 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Authentication: cache of per-user token versions used to validate JWTs
+    token_version_cache_size: int = 10000
+    token_version_cache_ttl_seconds: int = 30
+    
     class Config:
         # Try .env file if it exists, but also read from environment variables
         env_file = ".env"
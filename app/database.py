@@ -1,28 +1,126 @@
 """
 Database connection and session management
 """
+from contextlib import asynccontextmanager
+from typing import Any, Callable, TypeVar
+from uuid import uuid4
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 
 from app.config import get_settings
+from app.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from app.replicas import Replica, ReplicaSet
 
 # Get settings instance
 settings = get_settings()
 
+# Async drivers used when async mode derives its URL from DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Translate a sync database URL into the equivalent async driver URL."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver configured for database backend '{backend}'")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def get_engine_options(database_url: str, is_async: bool = False) -> dict:
+    """
+    Build create_engine keyword arguments for the configured connection pool.
+    
+    SQLite keeps SQLAlchemy's defaults. With DB_PGBOUNCER enabled, asyncpg's
+    prepared statement caches are disabled since transaction-mode PgBouncer
+    may run consecutive statements on different server connections.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        return {}
+    
+    options = {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if settings.db_pgbouncer and url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return options
+
+
 # Create SQLAlchemy engine only if DATABASE_URL is available
 # This allows the app to start even if DATABASE_URL is missing
 if settings.database_url:
-    engine = create_engine(settings.database_url)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine = create_engine(settings.database_url, **get_engine_options(settings.database_url))
+    # Routes serialize returned objects on the event loop, after the threadpool
+    # call that committed them, so they must not expire (and lazily reload) on commit
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 else:
     # Create a dummy engine/session for when DATABASE_URL is missing
     # This prevents crashes but database operations will fail
     engine = None
     SessionLocal = None
 
+# The async engine is opt-in; the sync engine above stays available for scripts and migrations
+if settings.database_url and settings.async_database:
+    _async_url = settings.async_database_url or get_async_database_url(settings.database_url)
+    async_engine = create_async_engine(_async_url, **get_engine_options(_async_url, is_async=True))
+    # Objects are serialized after the service call returns, outside the greenlet
+    # bridge, so they must not expire (and lazily reload) on commit
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+else:
+    async_engine = None
+    AsyncSessionLocal = None
+
+
+def _create_replicas() -> ReplicaSet:
+    """Create an engine per DATABASE_REPLICA_URLS entry, matching the primary's mode."""
+    if not settings.database_url or not settings.database_replica_urls:
+        return ReplicaSet([])
+    
+    replicas = []
+    urls = [url.strip() for url in settings.database_replica_urls.split(",") if url.strip()]
+    for index, url in enumerate(urls):
+        if settings.async_database:
+            url = get_async_database_url(url)
+            replica_engine = create_async_engine(url, **get_engine_options(url, is_async=True))
+            factory = async_sessionmaker(replica_engine, autoflush=False, expire_on_commit=False)
+        else:
+            replica_engine = create_engine(url, **get_engine_options(url))
+            factory = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=replica_engine)
+        replicas.append(Replica(f"replica_{index}", replica_engine, factory, settings.replica_retry_seconds))
+    return ReplicaSet(replicas)
+
+
+replicas = _create_replicas()
+
+# Set on responses to writes; while present, reads stay on the primary (read-your-writes)
+READ_PRIMARY_COOKIE = "read_primary"
+
 # Create Base class for declarative models
 Base = declarative_base()
 
+# Either kind of session, as yielded by get_session
+DbSession = Session | AsyncSession
+
+T = TypeVar("T")
+
 
 def get_db():
     """
@@ -38,3 +136,106 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    """
+    Dependency that provides an async database session.
+    Requires ASYNC_DATABASE=true.
+    """
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database mode is not enabled. Set ASYNC_DATABASE=true.")
+    
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+@asynccontextmanager
+async def session_scope(session_factory=None):
+    """
+    Open a session for the configured mode (async or sync) and close it afterwards.
+    
+    Uses the primary unless another session factory (e.g. a replica's) is given.
+    """
+    if session_factory is None:
+        session_factory = AsyncSessionLocal if settings.async_database else SessionLocal
+    if session_factory is None:
+        raise RuntimeError("DATABASE_URL is not configured. Cannot create database session.")
+    
+    if isinstance(session_factory, async_sessionmaker):
+        async with session_factory() as db:
+            yield db
+        return
+    
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        await _close_sync_session(db)
+
+
+async def _close_sync_session(db: Session) -> None:
+    """
+    Close a sync session, in the threadpool only if it holds a connection.
+    
+    Returning a connection rolls it back over the network; a session that
+    never queried (or already committed) has nothing to release, so closing
+    it inline saves a threadpool hop on every such request.
+    """
+    if db.in_transaction():
+        await run_in_threadpool(db.close)
+    else:
+        db.close()
+
+
+async def get_session():
+    """
+    Dependency used by the routers: yields an AsyncSession in async mode,
+    otherwise a sync Session. Pass it to services through run_in_session.
+    """
+    async with session_scope() as db:
+        yield db
+
+
+async def get_read_session(request: Request):
+    """
+    Dependency for read-only routes: yields a session on a healthy read replica.
+    
+    Falls back to the primary when no replicas are configured or healthy, and
+    for clients that wrote within the last REPLICA_STICKINESS_SECONDS so they
+    always read their own writes: ReadYourWritesMiddleware flags those through
+    request.state.read_primary (by user) and the read_primary cookie.
+    """
+    reads_primary = getattr(request.state, "read_primary", False) or READ_PRIMARY_COOKIE in request.cookies
+    replica = None
+    if replicas and not reads_primary:
+        replica = replicas.choose()
+    
+    async with session_scope(replica.session_factory if replica else None) as db:
+        yield db
+
+
+async def run_in_session(db: DbSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a service function against either kind of session.
+    
+    Services are written against the synchronous Session API. With an
+    AsyncSession they run through run_sync, so their queries are awaited on
+    the event loop via asyncpg; with a sync Session they run in the threadpool.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+async def release_session(db: DbSession) -> None:
+    """
+    Close a session early, returning its connection to the pool.
+    
+    For long-lived responses (e.g. event streams) whose request-scoped session
+    would otherwise stay open until the response ends. The session remains
+    usable and reconnects if queried again.
+    """
+    if isinstance(db, AsyncSession):
+        await db.close()
+    else:
+        await _close_sync_session(db)
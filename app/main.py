@@ -1,12 +1,40 @@
 """
 Course Registration API - Main Application Entry Point
 """
+import sys
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm in-memory indexes at startup; a missing database must not stop the app from serving /health."""
+    try:
+        from app.database import run_in_session, session_scope
+        from app.services import course_service, prerequisite_service
+        
+        loaders = [
+            ("course autocomplete index", course_service.load_autocomplete_index),
+            ("prerequisite graph", prerequisite_service.load_prerequisite_graph),
+        ]
+    except Exception as e:
+        print(f"WARNING: Failed to warm in-memory indexes: {e}", file=sys.stderr)
+        loaders = []
+    for label, loader in loaders:
+        try:
+            async with session_scope() as db:
+                await run_in_session(db, loader)
+        except Exception as e:
+            print(f"WARNING: Failed to build the {label}: {e}", file=sys.stderr)
+    yield
+
+
 app = FastAPI(
     title="Course Registration API",
     description="API for managing course registrations, departments, students, and enrollments",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
@@ -36,7 +64,9 @@ try:
         students_router,
         enrollments_router,
         auth_router,
-        prerequisites_router
+        prerequisites_router,
+        admin_router,
+        waitlists_router
     )
     
     app.include_router(auth_router)
@@ -45,9 +75,15 @@ try:
     app.include_router(students_router)
     app.include_router(enrollments_router)
     app.include_router(prerequisites_router)
+    app.include_router(admin_router)
+    app.include_router(waitlists_router)
+    
+    from app.database import replicas
+    if replicas:
+        from app.middleware.read_your_writes import ReadYourWritesMiddleware
+        app.add_middleware(ReadYourWritesMiddleware)
 except Exception as e:
     # Log the error but don't crash - health endpoint will still work
-    import sys
     print(f"WARNING: Failed to register some routers: {e}", file=sys.stderr)
     print("Health endpoint is still available at /health", file=sys.stderr)
 
@@ -5,12 +5,13 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from pydantic import ValidationError
 
 from app.config import get_settings
-from app.database import get_db
-from app.models.user import User, UserRole
-from app.services.auth_service import get_user_by_email
+from app.database import run_in_session, session_scope
+from app.models.user import UserRole
+from app.schemas.user import TokenData
+from app.services.auth_service import load_token_version, token_version_cache
 
 # OAuth2 scheme for token extraction
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
@@ -19,11 +20,18 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 settings = get_settings()
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user from JWT token."""
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
+    """
+    Get the current authenticated principal from JWT token.
+    
+    The principal is built from the signed claims. The only state checked
+    against the database is the user's token version, which is served from
+    an in-process cache and lets role/password changes revoke old tokens.
+    
+    This dependency runs on the event loop. A session is only opened on a
+    cache miss, and the lookup goes through run_in_session (async session or
+    threadpool), so cache hits never touch the pool.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -32,21 +40,31 @@ async def get_current_user(
     
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
+        current_user = TokenData(
+            email=payload.get("sub"),
+            role=payload.get("role"),
+            user_id=payload.get("uid"),
+            student_id=payload.get("student_id"),
+            token_version=payload.get("ver"),
+        )
+    except (JWTError, ValidationError):
         raise credentials_exception
     
-    user = get_user_by_email(db, email=email)
-    if user is None:
+    if current_user.email is None or current_user.user_id is None or current_user.token_version is None:
         raise credentials_exception
-    return user
+    
+    token_version = token_version_cache.get(current_user.user_id)
+    if token_version is None:
+        async with session_scope() as db:
+            token_version = await run_in_session(db, load_token_version, current_user.user_id)
+    if token_version != current_user.token_version:
+        raise credentials_exception
+    return current_user
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: TokenData = Depends(get_current_user)
+) -> TokenData:
     """Get the current active user (placeholder for future active/inactive logic)."""
     # For now, all users are considered active
     # In the future, you could add an 'is_active' field to the User model
@@ -56,8 +74,8 @@ async def get_current_active_user(
 def require_role(required_role: UserRole):
     """Dependency factory for role-based access control."""
     async def role_checker(
-        current_user: User = Depends(get_current_active_user)
-    ) -> User:
+        current_user: TokenData = Depends(get_current_active_user)
+    ) -> TokenData:
         if current_user.role != required_role.value:  # Compare string with enum value
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -71,8 +89,8 @@ def require_role(required_role: UserRole):
 def require_roles(required_roles: list[UserRole]):
     """Dependency factory for multiple roles allowed."""
     async def roles_checker(
-        current_user: User = Depends(get_current_active_user)
-    ) -> User:
+        current_user: TokenData = Depends(get_current_active_user)
+    ) -> TokenData:
         required_role_values = [r.value for r in required_roles]
         if current_user.role not in required_role_values:  # Compare string with enum values
             roles_str = ", ".join(required_role_values)
@@ -0,0 +1,82 @@
+"""
+Read-your-writes middleware for read replica routing
+"""
+import time
+
+from jose import JWTError, jwt
+
+from app.cache import create_cache
+from app.config import get_settings
+from app.database import READ_PRIMARY_COOKIE
+
+# Get settings
+settings = get_settings()
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# user_id -> time of their last successful write, kept for the stickiness window
+recent_writers = create_cache(
+    maxsize=settings.replica_stickiness_cache_size,
+    ttl=settings.replica_stickiness_seconds,
+    url=settings.replica_stickiness_cache_url,
+    prefix="recent_writer:"
+)
+
+
+def _get_principal_id(scope) -> int | None:
+    """Return the user id of the request's bearer token, or None if it has no valid one."""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return None
+            try:
+                payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+            except JWTError:
+                return None
+            user_id = payload.get("uid")
+            return user_id if isinstance(user_id, int) else None
+    return None
+
+
+class ReadYourWritesMiddleware:
+    """
+    Mark clients that just wrote so their next reads go to the primary.
+    
+    Successful writes are recorded against the authenticated user, so API
+    clients that never keep cookies still read their own changes; reads by
+    that user within REPLICA_STICKINESS_SECONDS set request.state.read_primary,
+    which get_read_session honours. Write responses still get a short-lived
+    cookie too, which cookie-keeping clients carry to every worker even when
+    REPLICA_STICKINESS_CACHE_URL does not share the last write times.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+        self.cookie = (
+            f"{READ_PRIMARY_COOKIE}=1; Max-Age={settings.replica_stickiness_seconds}; "
+            "Path=/; HttpOnly; SameSite=Lax"
+        ).encode("latin-1")
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        user_id = _get_principal_id(scope)
+        if scope["method"] not in WRITE_METHODS:
+            if user_id is not None and recent_writers.get(user_id) is not None:
+                scope.setdefault("state", {})["read_primary"] = True
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                if user_id is not None:
+                    recent_writers.set(user_id, time.time())
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", self.cookie))
+                message = {**message, "headers": headers}
+            await send(message)
+        
+        await self.app(scope, receive, send_with_cookie)
@@ -8,6 +8,8 @@ from app.models.course import Course
 from app.models.student import Student
 from app.models.enrollment import Enrollment
 from app.models.user import User, UserRole
-from app.models.prerequisite import Prerequisite
+from app.models.prerequisite import Prerequisite, PrerequisiteClosure
+from app.models.waitlist import WaitlistEntry
+from app.models.cache_version import CacheVersion
 
-__all__ = ["Department", "Course", "Student", "Enrollment", "User", "UserRole", "Prerequisite"]
+__all__ = ["Department", "Course", "Student", "Enrollment", "User", "UserRole", "Prerequisite", "PrerequisiteClosure", "WaitlistEntry", "CacheVersion"]
@@ -0,0 +1,20 @@
+"""
+Cache version model
+"""
+from sqlalchemy import Column, Integer, String
+
+from app.database import Base
+
+
+class CacheVersion(Base):
+    """
+    Version stamp of a data set that workers cache in memory.
+    
+    Writers increment the row in the same transaction as their change;
+    workers compare it with the version they loaded to tell when to reload.
+    """
+    
+    __tablename__ = "cache_versions"
+    
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
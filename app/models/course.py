@@ -1,7 +1,7 @@
 """
 Course model
 """
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -19,6 +19,9 @@ class Course(Base):
     department_id = Column(Integer, ForeignKey("departments.id"), nullable=False)
     max_students = Column(Integer, nullable=False, default=30)
     semester = Column(String(20), nullable=False)
+    # Active enrollments, maintained by enrollment_service in the same transaction
+    # as each enroll/drop; reconcile_enrolled_counts repairs any drift
+    enrolled_count = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
     department = relationship("Department", back_populates="courses")
@@ -33,4 +36,20 @@ class Course(Base):
         foreign_keys="Prerequisite.prerequisite_id",
         back_populates="prerequisite"
     )
-
+    
+    # Composite (sort column, id) indexes serve keyset pagination for each sort_by option
+    __table_args__ = (
+        Index("ix_courses_name_id", "name", "id"),
+        Index("ix_courses_code_id", "code", "id"),
+        Index("ix_courses_credits_id", "credits", "id"),
+        Index("ix_courses_semester_id", "semester", "id"),
+        # GIN trigram indexes serve ILIKE '%term%' search (PostgreSQL with pg_trgm only)
+        Index(
+            "ix_courses_code_trgm", "code",
+            postgresql_using="gin", postgresql_ops={"code": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_courses_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
@@ -3,7 +3,7 @@ Enrollment model
 """
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -32,8 +32,19 @@ class Enrollment(Base):
     student = relationship("Student", back_populates="enrollments")
     course = relationship("Course", back_populates="enrollments")
     
-    # Unique constraint: one enrollment record per student-course pair
+    # Unique constraint: one enrollment record per student-course pair.
+    # The partial indexes cover only active rows, so soft-deleted enrollments
+    # do not slow down seat counts, rosters or prerequisite checks.
     __table_args__ = (
         UniqueConstraint("student_id", "course_id", name="uq_student_course"),
+        Index(
+            "ix_enrollments_course_enrolled", "course_id", "student_id",
+            postgresql_where=text("status = 'enrolled'"), sqlite_where=text("status = 'enrolled'")
+        ),
+        Index(
+            "ix_enrollments_student_enrolled", "student_id", "course_id",
+            postgresql_where=text("status = 'enrolled'"), sqlite_where=text("status = 'enrolled'")
+        ),
+        Index("ix_enrollments_course_status", "course_id", "status"),
     )
 
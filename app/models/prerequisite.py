@@ -1,7 +1,7 @@
 """
 Prerequisite model for course prerequisites
 """
-from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -20,11 +20,37 @@ class Prerequisite(Base):
     course_id = Column(Integer, ForeignKey("courses.id"), nullable=False, index=True)
     prerequisite_id = Column(Integer, ForeignKey("courses.id"), nullable=False, index=True)
     
-    # Relationships
-    course = relationship("Course", foreign_keys=[course_id], back_populates="prerequisites")
-    prerequisite = relationship("Course", foreign_keys=[prerequisite_id], back_populates="is_prerequisite_for")
+    # Relationships (eager-loaded: responses serialize both ends, and async sessions cannot lazy-load)
+    course = relationship("Course", foreign_keys=[course_id], back_populates="prerequisites", lazy="joined")
+    prerequisite = relationship(
+        "Course", foreign_keys=[prerequisite_id], back_populates="is_prerequisite_for", lazy="joined"
+    )
     
     # Unique constraint: prevent duplicate prerequisite relationships
     __table_args__ = (
         UniqueConstraint("course_id", "prerequisite_id", name="uq_course_prerequisite"),
     )
+
+
+class PrerequisiteClosure(Base):
+    """
+    Materialized transitive closure of course_prerequisites.
+    
+    One row per (course, direct or indirect prerequisite) pair, with the
+    length of the shortest prerequisite chain between them (1 = direct).
+    Maintained by prerequisite_service on every edge insert and delete, in
+    the same transaction.
+    """
+    
+    __tablename__ = "course_prerequisite_closure"
+    
+    # The course that requires ancestor_id (directly or through other courses)
+    descendant_id = Column(Integer, ForeignKey("courses.id"), primary_key=True)
+    ancestor_id = Column(Integer, ForeignKey("courses.id"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+    
+    # The primary key serves "all prerequisites of X" and the cycle check;
+    # this index serves "all courses that require X"
+    __table_args__ = (
+        Index("ix_course_prerequisite_closure_ancestor", "ancestor_id"),
+    )
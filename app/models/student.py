@@ -1,7 +1,7 @@
 """
 Student model
 """
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -22,4 +22,23 @@ class Student(Base):
     department = relationship("Department", back_populates="students")
     enrollments = relationship("Enrollment", back_populates="student")
     user = relationship("User", back_populates="student", uselist=False)
-
+    
+    # Composite (sort column, id) indexes serve keyset pagination for each sort_by option
+    __table_args__ = (
+        Index("ix_students_name_id", "name", "id"),
+        Index("ix_students_email_id", "email", "id"),
+        Index("ix_students_student_number_id", "student_number", "id"),
+        # GIN trigram indexes serve ILIKE '%term%' search (PostgreSQL with pg_trgm only)
+        Index(
+            "ix_students_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_students_email_trgm", "email",
+            postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_students_student_number_trgm", "student_number",
+            postgresql_using="gin", postgresql_ops={"student_number": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
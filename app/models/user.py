@@ -26,6 +26,8 @@ class User(Base):
     hashed_password = Column(String(255), nullable=False)
     role = Column(String(20), nullable=False, index=True)  # Stored as string, use UserRole enum for validation
     student_id = Column(Integer, ForeignKey("students.id"), nullable=True, unique=True)
+    # Incremented whenever the role or password changes; tokens carrying an older version are rejected
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
@@ -0,0 +1,32 @@
+"""
+Waitlist model
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, UniqueConstraint
+
+from app.database import Base
+
+
+class WaitlistEntry(Base):
+    """
+    A student waiting for a seat in a full course.
+    
+    Entries are served in position order: when a seat opens, the entry with
+    the lowest position is enrolled and its row deleted. Positions only grow
+    within a course, so gaps left by promoted or withdrawn entries are fine.
+    """
+    
+    __tablename__ = "waitlist_entries"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
+    position = Column(Integer, nullable=False)
+    joined_at = Column(DateTime, default=datetime.utcnow)
+    
+    # One entry per student-course pair; (course_id, position) finds the queue head
+    __table_args__ = (
+        UniqueConstraint("student_id", "course_id", name="uq_waitlist_student_course"),
+        Index("ix_waitlist_entries_course_position", "course_id", "position", unique=True),
+    )
@@ -0,0 +1,147 @@
+"""
+Pagination helpers: keyset cursors and total counts
+
+A cursor records the sort value and id of the last row on a page. The next
+page seeks past that (value, id) pair instead of using OFFSET, so every
+page costs the same however deep the client goes.
+"""
+import base64
+import binascii
+import json
+from typing import Any, Hashable
+
+from sqlalchemy import tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.cache import TTLCache
+from app.config import get_settings
+from app.exceptions import bad_request
+
+# Get settings
+settings = get_settings()
+
+# (resource, filters...) -> recent row count, served to total_mode=estimated
+count_cache = TTLCache(maxsize=settings.count_cache_size, ttl=settings.count_cache_ttl_seconds)
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) wrapper for a select statement (PostgreSQL only)."""
+    
+    inherit_cache = False
+    
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def estimate_count(query: Query) -> int:
+    """
+    Estimate the number of rows a query returns.
+    
+    Uses the planner's row estimate on PostgreSQL, which costs no scan;
+    other databases fall back to an exact COUNT.
+    """
+    if query.session.get_bind().dialect.name != "postgresql":
+        return query.count()
+    
+    plan = query.session.execute(Explain(query.statement)).scalar()
+    if isinstance(plan, str):  # asyncpg returns json columns undecoded
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_total(query: Query, total_mode: str, cache_key: Hashable) -> int | None:
+    """
+    Compute the total for a paginated query according to total_mode.
+    
+    - exact: COUNT(*) on every call
+    - estimated: a count cached briefly per filter set, computed from the
+      planner estimate on a cache miss
+    - none: no total at all
+    """
+    if total_mode == "none":
+        return None
+    
+    if total_mode == "exact":
+        total = query.count()
+        count_cache.set(cache_key, total)
+        return total
+    
+    total = count_cache.get(cache_key)
+    if total is None:
+        total = estimate_count(query)
+        count_cache.set(cache_key, total)
+    return total
+
+
+def encode_cursor(sort_by: str, sort_order: str, value: Any, row_id: int) -> str:
+    """Encode the position after a row as an opaque cursor string."""
+    payload = json.dumps([sort_by, sort_order, value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str, value_type: type) -> tuple[Any, int]:
+    """
+    Decode a cursor into its (sort value, id) position.
+    
+    Raises 400 if the cursor is malformed, was issued for a different sort,
+    or its sort value is not a value_type scalar.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort_by, cursor_sort_order, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise bad_request("Invalid cursor")
+    
+    if (cursor_sort_by, cursor_sort_order) != (sort_by, sort_order):
+        raise bad_request("Cursor does not match the requested sort_by/sort_order")
+    # Exact type checks: JSON true/false would otherwise pass for an int
+    if type(value) is not value_type or type(row_id) is not int:
+        raise bad_request("Invalid cursor")
+    return value, row_id
+
+
+def apply_sort(query: Query, sort_column, id_column, sort_order: str) -> Query:
+    """Order by the sort column with id as a tie-breaker, so the order is total."""
+    if sort_order == "desc":
+        return query.order_by(sort_column.desc(), id_column.desc())
+    return query.order_by(sort_column.asc(), id_column.asc())
+
+
+def fetch_keyset_page(
+    query: Query,
+    sort_column,
+    id_column,
+    sort_by: str,
+    sort_order: str,
+    cursor: str,
+    page_size: int
+) -> tuple[list, str | None]:
+    """
+    Fetch one page after the cursor position.
+    
+    An empty cursor starts from the first row. Returns (rows, next_cursor),
+    where next_cursor is None on the last page.
+    """
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort_by, sort_order, sort_column.type.python_type)
+        if sort_order == "desc":
+            query = query.filter(tuple_(sort_column, id_column) < tuple_(value, row_id))
+        else:
+            query = query.filter(tuple_(sort_column, id_column) > tuple_(value, row_id))
+    
+    # Fetch one extra row to learn whether another page exists
+    rows = apply_sort(query, sort_column, id_column, sort_order).limit(page_size + 1).all()
+    if len(rows) <= page_size:
+        return rows, None
+    
+    rows = rows[:page_size]
+    last = rows[-1]
+    next_cursor = encode_cursor(sort_by, sort_order, getattr(last, sort_column.key), last.id)
+    return rows, next_cursor
@@ -0,0 +1,102 @@
+"""
+Instrumented connection pools and pool status reporting
+"""
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class WaitHistogram:
+    """Cumulative histogram of how long callers waited to check out a connection."""
+    
+    # Upper bounds in seconds; an implicit +Inf bucket follows
+    BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self._counts = [0] * (len(self.BUCKETS) + 1)
+        self._sum = 0.0
+        self._timeouts = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Record one checkout wait."""
+        index = len(self.BUCKETS)
+        for i, bound in enumerate(self.BUCKETS):
+            if seconds <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+
+    def record_timeout(self) -> None:
+        """Record a checkout that gave up after pool_timeout."""
+        with self._lock:
+            self._timeouts += 1
+
+    def snapshot(self) -> dict:
+        """Return cumulative bucket counts, total count, sum and timeouts."""
+        with self._lock:
+            counts = list(self._counts)
+            total_sum = self._sum
+            timeouts = self._timeouts
+        
+        buckets = []
+        cumulative = 0
+        for bound, count in zip(self.BUCKETS + (None,), counts):
+            cumulative += count
+            buckets.append({"le": bound, "count": cumulative})
+        return {
+            "buckets": buckets,
+            "count": cumulative,
+            "sum_seconds": total_sum,
+            "timeouts": timeouts,
+        }
+
+
+class _WaitTimingMixin:
+    """Times every connection checkout made through the pool."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_histogram = WaitHistogram()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.wait_histogram.record_timeout()
+            raise
+        finally:
+            self.wait_histogram.observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    """QueuePool that records checkout wait times."""
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout wait times."""
+
+
+def pool_status(name: str, engine) -> dict:
+    """Report live connection counts (and wait times, if instrumented) for an engine's pool."""
+    pool = getattr(engine, "sync_engine", engine).pool
+    status = {"name": name, "pool_class": type(pool).__name__}
+    
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            # overflow() counts down from -size until the base pool is full
+            "overflow": max(pool.overflow(), 0),
+        })
+    
+    histogram = getattr(pool, "wait_histogram", None)
+    if histogram is not None:
+        status["wait_time"] = histogram.snapshot()
+    return status
@@ -0,0 +1,327 @@
+"""
+Course prerequisite graph traversal
+
+Traversals are served by one of three backends, chosen with
+PREREQUISITE_GRAPH_BACKEND: PrerequisiteGraph holds the edges in memory, the
+recursive CTE queries at the bottom of this module compute closures in the
+database, and the course_prerequisite_closure table (maintained from the
+same CTE) answers them with indexed lookups.
+"""
+import threading
+import time
+from collections import deque
+from typing import Iterable
+
+from sqlalchemy import Select, func, literal_column, select
+from sqlalchemy.orm import Session
+
+from app.cache_versions import bump_version, read_version
+from app.config import get_settings
+from app.models.prerequisite import Prerequisite
+
+# Get settings
+settings = get_settings()
+
+GRAPH_VERSION_NAME = "prerequisites"
+
+# Recursion guard for the CTE queries; cycles are rejected on insert, so only
+# corrupt data could ever reach it
+MAX_CHAIN_DEPTH = 100
+
+
+class PrerequisiteGraph:
+    """
+    Forward (course -> prerequisites) and reverse (prerequisite -> courses)
+    adjacency maps over course_prerequisites.
+    
+    Each worker process holds its own copy, stamped with the version of the
+    "prerequisites" row in cache_versions it was loaded at. Every write to
+    course_prerequisites bumps that version in the same transaction, so a
+    worker notices changes made by others by comparing stamps. Reads check at
+    most once per `check_interval` seconds; writes always check, under the
+    version row lock. The worker that made a change applies it in place
+    instead of reloading.
+    
+    Neighbours are kept in insertion (row id) order, so traversals visit
+    prerequisites in the order they were added.
+    """
+
+    def __init__(self, check_interval: float = 1.0):
+        self.check_interval = check_interval
+        self.version: int | None = None
+        self._forward: dict[int, dict[int, None]] = {}
+        self._reverse: dict[int, dict[int, None]] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def build(self, edges: Iterable[tuple[int, int]], version: int) -> None:
+        """Replace the graph with the given (course_id, prerequisite_id) edges."""
+        forward: dict[int, dict[int, None]] = {}
+        reverse: dict[int, dict[int, None]] = {}
+        for course_id, prerequisite_id in edges:
+            forward.setdefault(course_id, {})[prerequisite_id] = None
+            reverse.setdefault(prerequisite_id, {})[course_id] = None
+        with self._lock:
+            # A load that raced with a newer in-place change must not roll it back
+            if self.version is not None and version < self.version:
+                return
+            self._forward = forward
+            self._reverse = reverse
+            self.version = version
+            self._checked_at = time.monotonic()
+
+    def add(self, course_id: int, prerequisite_id: int, version: int) -> None:
+        """Apply a committed edge insert (idempotent)."""
+        with self._lock:
+            self._forward.setdefault(course_id, {})[prerequisite_id] = None
+            self._reverse.setdefault(prerequisite_id, {})[course_id] = None
+            self._advance(version)
+
+    def remove(self, course_id: int, prerequisite_id: int, version: int) -> None:
+        """Apply a committed edge delete (idempotent)."""
+        with self._lock:
+            self._forward.get(course_id, {}).pop(prerequisite_id, None)
+            self._reverse.get(prerequisite_id, {}).pop(course_id, None)
+            self._advance(version)
+
+    def _advance(self, version: int) -> None:
+        if self.version is not None:
+            self.version = max(self.version, version)
+
+    def ensure_fresh(self, db: Session, force: bool = False) -> None:
+        """Reload from the database if another worker changed the graph since it was loaded."""
+        # Database reads happen outside the lock: with an async session they
+        # yield to the event loop, where other requests share this thread
+        if not force and self.version is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return
+        version = read_graph_version(db)
+        # A lagging replica can report an older version than this copy has seen
+        if self.version is None or version > self.version:
+            self.load(db, version)
+        else:
+            self._checked_at = time.monotonic()
+
+    def sync(self, db: Session, version: int) -> None:
+        """
+        Make sure the graph reflects the given version, reloading if it does not.
+        
+        Writers call this after bump_graph_version with the version preceding
+        their own, while holding the version row lock, so no other change can
+        land between the load and theirs.
+        """
+        if version != self.version:
+            self.load(db, version)
+
+    def load(self, db: Session, version: int | None = None) -> None:
+        """Load every edge from the database (at the given version, or the current one)."""
+        if version is None:
+            version = read_graph_version(db)
+        edges = db.query(Prerequisite.course_id, Prerequisite.prerequisite_id).order_by(Prerequisite.id).all()
+        self.build(edges, version)
+
+    def direct_prerequisites(self, course_id: int) -> list[int]:
+        """Ids of the course's direct prerequisites."""
+        with self._lock:
+            return list(self._forward.get(course_id, ()))
+
+    def direct_dependents(self, course_id: int) -> list[int]:
+        """Ids of the courses that list this course as a direct prerequisite."""
+        with self._lock:
+            return list(self._reverse.get(course_id, ()))
+
+    def all_prerequisites(self, course_id: int) -> list[int]:
+        """Ids of all direct and indirect prerequisites, in depth-first order."""
+        return self._walk(self._forward, course_id)
+
+    def all_dependents(self, course_id: int) -> list[int]:
+        """Ids of all courses that require this course directly or indirectly."""
+        return self._walk(self._reverse, course_id)
+
+    def _walk(self, adjacency: dict[int, dict[int, None]], start: int) -> list[int]:
+        with self._lock:
+            visited = {start}
+            result = []
+            stack = list(reversed(adjacency.get(start, ())))
+            while stack:
+                node = stack.pop()
+                if node in visited:
+                    continue
+                visited.add(node)
+                result.append(node)
+                stack.extend(reversed(adjacency.get(node, ())))
+            return result
+
+    def reaches(self, start: int, target: int) -> bool:
+        """True if target is start or one of its direct or indirect prerequisites."""
+        return start == target or target in self._walk(self._forward, start)
+
+
+def find_cycles(edges: Iterable[tuple[int, int]]) -> list[list[int]]:
+    """
+    Check (course_id, prerequisite_id) edges for cycles with one topological sort.
+    
+    Kahn's algorithm repeatedly removes courses that no remaining course
+    requires; if every course is removed the edges form a DAG and [] is
+    returned. Otherwise the courses left over are split into strongly
+    connected components, one per independent group of cycles, and a
+    shortest cycle through the lowest id of each is returned as
+    [a, b, ..., a] (each course requires the next).
+    """
+    adjacency: dict[int, list[int]] = {}
+    in_degree: dict[int, int] = {}
+    for course_id, prerequisite_id in edges:
+        adjacency.setdefault(course_id, []).append(prerequisite_id)
+        in_degree.setdefault(course_id, 0)
+        in_degree[prerequisite_id] = in_degree.get(prerequisite_id, 0) + 1
+    
+    queue = deque(node for node, degree in in_degree.items() if degree == 0)
+    while queue:
+        node = queue.popleft()
+        del in_degree[node]
+        for prerequisite_id in adjacency.get(node, ()):
+            in_degree[prerequisite_id] -= 1
+            if in_degree[prerequisite_id] == 0:
+                queue.append(prerequisite_id)
+    if not in_degree:
+        return []
+    
+    # Only cycles and the courses they lead to survive the sort
+    remaining = {
+        node: [prerequisite_id for prerequisite_id in adjacency.get(node, ()) if prerequisite_id in in_degree]
+        for node in in_degree
+    }
+    cycles = []
+    for component in _strongly_connected_components(remaining):
+        members = set(component)
+        start = min(component)
+        if len(component) > 1 or start in remaining[start]:
+            cycles.append(_shortest_cycle(start, remaining, members))
+    return sorted(cycles)
+
+
+def _strongly_connected_components(adjacency: dict[int, list[int]]) -> list[list[int]]:
+    """Tarjan's algorithm, iterative so deep chains cannot exhaust the stack."""
+    index: dict[int, int] = {}
+    low: dict[int, int] = {}
+    stack: list[int] = []
+    on_stack: set[int] = set()
+    components = []
+    for root in adjacency:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(adjacency[root]))]
+        while work:
+            node, neighbours = work[-1]
+            for neighbour in neighbours:
+                if neighbour not in index:
+                    index[neighbour] = low[neighbour] = len(index)
+                    stack.append(neighbour)
+                    on_stack.add(neighbour)
+                    work.append((neighbour, iter(adjacency[neighbour])))
+                    break
+                if neighbour in on_stack:
+                    low[node] = min(low[node], index[neighbour])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def _shortest_cycle(start: int, adjacency: dict[int, list[int]], members: set[int]) -> list[int]:
+    """Breadth-first search for the shortest cycle from start back to itself within members."""
+    parents: dict[int, int | None] = {start: None}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for neighbour in adjacency[node]:
+            if neighbour == start:
+                path = [node]
+                while parents[path[-1]] is not None:
+                    path.append(parents[path[-1]])
+                return [*reversed(path), start]
+            if neighbour in members and neighbour not in parents:
+                parents[neighbour] = node
+                queue.append(neighbour)
+    return [start, start]
+
+
+def read_graph_version(db: Session) -> int:
+    """Return the current prerequisite graph version (0 if never bumped)."""
+    return read_version(db, GRAPH_VERSION_NAME)
+
+
+def bump_graph_version(db: Session) -> int:
+    """
+    Increment the prerequisite graph version in the current transaction and return it.
+    
+    The UPDATE locks the version row until commit, which also serializes
+    concurrent prerequisite writes (and so their cycle checks).
+    """
+    return bump_version(db, GRAPH_VERSION_NAME)
+
+
+def closure_query(course_ids: Iterable[int] | None = None) -> Select:
+    """
+    One WITH RECURSIVE query for the prerequisite closure of several courses
+    (of every course with prerequisites if course_ids is None).
+    
+    Yields (root_id, course_id, depth) rows: every direct or indirect
+    prerequisite of each root with its shortest distance (1 = direct),
+    ordered by root, depth and id. UNION (not UNION ALL) drops repeated
+    (root, course, depth) rows, so shared sub-chains are only expanded once
+    per depth.
+    """
+    edges = Prerequisite.__table__
+    seed = select(
+        edges.c.course_id.label("root_id"),
+        edges.c.prerequisite_id.label("course_id"),
+        literal_column("1").label("depth")
+    )
+    if course_ids is not None:
+        seed = seed.where(edges.c.course_id.in_(list(course_ids)))
+    closure = seed.cte("prerequisite_closure", recursive=True)
+    closure = closure.union(
+        select(closure.c.root_id, edges.c.prerequisite_id, closure.c.depth + 1)
+        .join_from(closure, edges, edges.c.course_id == closure.c.course_id)
+        .where(closure.c.depth < MAX_CHAIN_DEPTH)
+    )
+    depth = func.min(closure.c.depth).label("depth")
+    return (
+        select(closure.c.root_id, closure.c.course_id, depth)
+        .group_by(closure.c.root_id, closure.c.course_id)
+        .order_by(closure.c.root_id, depth, closure.c.course_id)
+    )
+
+
+def reaches_query(start_id: int, target_id: int) -> Select:
+    """
+    One WITH RECURSIVE query that is true if target_id is a direct or
+    indirect prerequisite of start_id.
+    
+    Only course ids are carried, so UNION terminates even on cyclic data.
+    """
+    edges = Prerequisite.__table__
+    reachable = select(edges.c.prerequisite_id.label("course_id")).where(
+        edges.c.course_id == start_id
+    ).cte("reachable_prerequisites", recursive=True)
+    reachable = reachable.union(
+        select(edges.c.prerequisite_id).join_from(reachable, edges, edges.c.course_id == reachable.c.course_id)
+    )
+    return select(select(reachable.c.course_id).where(reachable.c.course_id == target_id).exists())
+
+
+prerequisite_graph = PrerequisiteGraph(check_interval=settings.prerequisite_graph_check_seconds)
@@ -0,0 +1,60 @@
+"""
+Read replica selection
+"""
+import itertools
+import threading
+import time
+
+from sqlalchemy import event
+
+
+class Replica:
+    """A read replica engine with its session factory and health state."""
+
+    def __init__(self, name: str, engine, session_factory, retry_seconds: float):
+        self.name = name
+        self.engine = engine
+        self.session_factory = session_factory
+        self.retry_seconds = retry_seconds
+        self.down_until = 0.0
+        
+        # Connection failures and disconnects take the replica out of rotation
+        sync_engine = getattr(engine, "sync_engine", engine)
+        event.listen(sync_engine, "handle_error", self._on_error)
+
+    def _on_error(self, context) -> None:
+        # context.connection is None when the failure happened while connecting
+        if context.is_disconnect or context.connection is None:
+            self.mark_down()
+
+    def mark_down(self) -> None:
+        """Skip this replica until retry_seconds have passed."""
+        self.down_until = time.monotonic() + self.retry_seconds
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+
+class ReplicaSet:
+    """Round-robin selection over read replicas, skipping unhealthy ones."""
+
+    def __init__(self, replicas: list[Replica]):
+        self.replicas = replicas
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self) -> Replica | None:
+        """Return the next healthy replica, or None if all are down."""
+        if not self.replicas:
+            return None
+        with self._lock:
+            start = next(self._counter)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if replica.healthy:
+                return replica
+        return None
@@ -7,6 +7,8 @@ from app.routers.students import router as students_router
 from app.routers.enrollments import router as enrollments_router
 from app.routers.auth import router as auth_router
 from app.routers.prerequisites import router as prerequisites_router
+from app.routers.admin import router as admin_router
+from app.routers.waitlists import router as waitlists_router
 
 __all__ = [
     "departments_router",
@@ -14,5 +16,7 @@ __all__ = [
     "students_router",
     "enrollments_router",
     "auth_router",
-    "prerequisites_router"
+    "prerequisites_router",
+    "admin_router",
+    "waitlists_router"
 ]
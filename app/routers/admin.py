@@ -0,0 +1,55 @@
+"""
+Admin and monitoring API routes
+"""
+from fastapi import APIRouter, Depends, Query
+
+from app import database
+from app.broadcast import availability_cache
+from app.database import DbSession, get_session, run_in_session
+from app.pagination import count_cache
+from app.schemas.admin import CacheStats, EnrolledCountReconciliation, PoolStatus
+from app.services import enrollment_service
+from app.services.auth_service import token_version_cache
+from app.pool import pool_status
+from app.middleware.auth import require_role
+from app.models.user import UserRole
+from app.schemas.user import TokenData
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+@router.get("/pool", response_model=list[PoolStatus])
+async def get_pool_status(
+    current_user: TokenData = Depends(require_role(UserRole.ADMIN))
+):
+    """Get live connection pool counts and checkout wait times (Admin only)."""
+    engines = {"primary": database.engine, "primary_async": database.async_engine}
+    engines.update({replica.name: replica.engine for replica in database.replicas.replicas})
+    return [pool_status(name, engine) for name, engine in engines.items() if engine is not None]
+
+
+@router.get("/caches", response_model=list[CacheStats])
+async def get_cache_stats(
+    current_user: TokenData = Depends(require_role(UserRole.ADMIN))
+):
+    """Get size and hit/miss counters of the service caches (Admin only)."""
+    caches = {
+        "availability": availability_cache,
+        "count": count_cache,
+        "token_version": token_version_cache,
+    }
+    return [
+        CacheStats(name=name, backend=type(cache).__name__, **cache.stats())
+        for name, cache in caches.items()
+    ]
+
+
+@router.post("/reconcile-enrolled-counts", response_model=EnrolledCountReconciliation)
+async def reconcile_enrolled_counts(
+    dry_run: bool = Query(default=False, description="Only report drift, do not repair it"),
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(require_role(UserRole.ADMIN))
+):
+    """Detect (and unless dry_run, repair) courses whose stored enrolled_count has drifted (Admin only)."""
+    drifted = await run_in_session(db, enrollment_service.reconcile_enrolled_counts, repair=not dry_run)
+    return {"repaired": not dry_run, "drifted": drifted}
@@ -3,24 +3,42 @@ Authentication API routes
 """
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.schemas.user import UserCreate, UserResponse, UserLogin, Token
+from app.database import DbSession, get_session, run_in_session
+from app.schemas.user import (
+    UserCreate,
+    UserResponse,
+    UserLogin,
+    UserRoleUpdate,
+    PasswordChange,
+    Token,
+    TokenData,
+)
 from app.services import auth_service
 from app.middleware.auth import get_current_active_user, require_role
 from app.models.user import User, UserRole
-from app.exceptions import conflict, bad_request
+from app.exceptions import conflict, bad_request, not_found
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
 
+async def _authenticate(db: DbSession, email: str, password: str) -> User | None:
+    """Authenticate a user, keeping the bcrypt check off the event loop."""
+    user = await run_in_session(db, auth_service.get_user_by_email, email)
+    if not user:
+        return None
+    if not await run_in_threadpool(auth_service.verify_password, password, user.hashed_password):
+        return None
+    return user
+
+
 @router.post("/register", response_model=UserResponse, status_code=201)
-def register(
+async def register(
     user: UserCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(UserRole.ADMIN))
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(require_role(UserRole.ADMIN))
 ):
     """
     Register a new user (Admin only).
@@ -29,36 +47,38 @@ def register(
     or through a separate script.
     """
     # Check if user with email already exists
-    existing_user = auth_service.get_user_by_email(db, user.email)
+    existing_user = await run_in_session(db, auth_service.get_user_by_email, user.email)
     if existing_user:
         raise conflict(f"User with email '{user.email}' already exists")
     
     # If student_id is provided, validate it exists
     if user.student_id:
         from app.services import student_service
-        student = student_service.get_student_by_id(db, user.student_id)
+        student = await run_in_session(db, student_service.get_student_by_id, user.student_id)
         if not student:
             raise bad_request(f"Student with id {user.student_id} does not exist")
         
         # Check if student already has a user account
-        existing_student_user = db.query(User).filter(User.student_id == user.student_id).first()
+        existing_student_user = await run_in_session(db, auth_service.get_user_by_student_id, user.student_id)
         if existing_student_user:
             raise conflict(f"Student with id {user.student_id} already has a user account")
     
-    return auth_service.create_user(db, user)
+    # Hash in the threadpool: in async mode services run on the event loop
+    hashed_password = await run_in_threadpool(auth_service.hash_password, user.password)
+    return await run_in_session(db, auth_service.create_user, user, hashed_password)
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Login and receive JWT access token.
     
     Use form data with 'username' (email) and 'password' fields.
     """
-    user = auth_service.authenticate_user(db, form_data.username, form_data.password)
+    user = await _authenticate(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -68,23 +88,23 @@ def login(
     
     access_token_expires = timedelta(minutes=30)
     access_token = auth_service.create_access_token(
-        data={"sub": user.email, "role": user.role},  # role is already a string
+        data=auth_service.build_token_claims(user),
         expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.post("/login-json", response_model=Token)
-def login_json(
+async def login_json(
     user_login: UserLogin,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Login using JSON body (alternative to OAuth2 form).
     
     Use this endpoint if you prefer JSON over form data.
     """
-    user = auth_service.authenticate_user(db, user_login.email, user_login.password)
+    user = await _authenticate(db, user_login.email, user_login.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -94,15 +114,57 @@ def login_json(
     
     access_token_expires = timedelta(minutes=30)
     access_token = auth_service.create_access_token(
-        data={"sub": user.email, "role": user.role},  # role is already a string
+        data=auth_service.build_token_claims(user),
         expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(
-    current_user: User = Depends(get_current_active_user)
+async def get_current_user_info(
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(get_current_active_user)
 ):
     """Get current authenticated user information."""
-    return current_user
+    user = await run_in_session(db, auth_service.get_user_by_id, current_user.user_id)
+    if not user:
+        raise not_found("User", current_user.user_id)
+    return user
+
+
+@router.put("/me/password", response_model=UserResponse)
+async def change_password(
+    password_change: PasswordChange,
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(get_current_active_user)
+):
+    """
+    Change the current user's password.
+    
+    All of the user's existing tokens, including the one used for this
+    request, stop working; log in again with the new password.
+    """
+    user = await _authenticate(db, current_user.email, password_change.current_password)
+    if not user:
+        raise bad_request("Current password is incorrect")
+    hashed_password = await run_in_threadpool(auth_service.hash_password, password_change.new_password)
+    return await run_in_session(db, auth_service.update_user_password, user, hashed_password)
+
+
+@router.put("/users/{user_id}/role", response_model=UserResponse)
+async def change_user_role(
+    user_id: int,
+    role_update: UserRoleUpdate,
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(require_role(UserRole.ADMIN))
+):
+    """
+    Change a user's role (Admin only).
+    
+    The user's existing tokens are revoked so the new role takes effect
+    on their next login.
+    """
+    user = await run_in_session(db, auth_service.get_user_by_id, user_id)
+    if not user:
+        raise not_found("User", user_id)
+    return await run_in_session(db, auth_service.update_user_role, user, role_update.role)
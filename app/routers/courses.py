@@ -1,33 +1,62 @@
 """
 Course API routes
 """
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+import asyncio
+import json
 
-from app.database import get_db
-from app.schemas.course import CourseCreate, CourseUpdate, CourseResponse
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.broadcast import availability_broadcaster, availability_event
+from app.config import get_settings
+from app.database import DbSession, get_read_session, get_session, release_session, run_in_session, session_scope
+from app.schemas.course import CourseCreate, CourseUpdate, CourseResponse, CourseSearchResult, CourseSuggestion
 from app.schemas.student import StudentResponse
 from app.schemas.enrollment import AvailabilityResponse
+from app.schemas.waitlist import WaitlistEntryResponse
 from app.schemas.common import PaginationParams, PaginatedResponse, CourseFilterParams, CourseSortParams
-from app.services import department_service, course_service, enrollment_service
+from app.services import department_service, course_service, enrollment_service, waitlist_service
 from app.exceptions import not_found, conflict, bad_request
 from app.middleware.auth import get_current_active_user, require_role, require_roles
-from app.models.user import User, UserRole
+from app.models.user import UserRole
+from app.schemas.user import TokenData
+
+# Get settings
+settings = get_settings()
 
 router = APIRouter(prefix="/api/courses", tags=["courses"])
 
 
+def parse_course_ids(ids: str, max_courses: int) -> list[int]:
+    """Parse a comma-separated list of course ids, enforcing the per-request limit."""
+    try:
+        course_ids = sorted({int(part) for part in ids.split(",") if part.strip()})
+    except ValueError:
+        raise bad_request("ids must be a comma-separated list of course ids")
+    if not course_ids:
+        raise bad_request("ids must contain at least one course id")
+    if len(course_ids) > max_courses:
+        raise bad_request(f"At most {max_courses} course ids are allowed")
+    return course_ids
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
 @router.get("/", response_model=PaginatedResponse[CourseResponse])
-def list_courses(
+async def list_courses(
     pagination: PaginationParams = Depends(),
     filters: CourseFilterParams = Depends(),
     sort: CourseSortParams = Depends(),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: DbSession = Depends(get_read_session),
+    current_user: TokenData = Depends(get_current_active_user)
 ):
     """Get all courses with pagination, filtering, sorting, and search (all authenticated users)."""
-    courses, total = course_service.get_all_courses(
+    courses, total, next_cursor = await run_in_session(
         db,
+        course_service.get_all_courses,
         page=pagination.page,
         page_size=pagination.page_size,
         dept_code=filters.dept_code,
@@ -35,97 +64,221 @@ def list_courses(
         semester=filters.semester,
         search=filters.search,
         sort_by=sort.sort_by,
-        sort_order=sort.sort_order
+        sort_order=sort.sort_order,
+        cursor=pagination.cursor,
+        total_mode=pagination.total_mode
     )
     return PaginatedResponse.create(
         items=courses,
         total=total,
         page=pagination.page,
-        page_size=pagination.page_size
+        page_size=pagination.page_size,
+        next_cursor=next_cursor,
+        total_mode=pagination.total_mode
+    )
+
+
+@router.get("/search", response_model=list[CourseSearchResult])
+async def search_courses(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text (words match as prefixes)"),
+    dept_id: int | None = Query(default=None, description="Filter by department ID"),
+    semester: str | None = Query(default=None, description="Filter by semester (e.g., 'Fall 2024')"),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: DbSession = Depends(get_read_session),
+    current_user: TokenData = Depends(get_current_active_user)
+):
+    """Ranked full-text search over course code, name and department (all authenticated users)."""
+    results = await run_in_session(
+        db, course_service.search_courses, q, dept_id=dept_id, semester=semester, limit=limit
+    )
+    return [
+        CourseSearchResult(
+            **CourseResponse.model_validate(course).model_dump(), rank=rank, headline=headline
+        )
+        for course, rank, headline in results
+    ]
+
+
+@router.get("/autocomplete", response_model=list[CourseSuggestion])
+async def autocomplete_courses(
+    q: str = Query(..., min_length=1, max_length=100, description="Typed prefix of a course code or name"),
+    limit: int = Query(default=10, ge=1, le=50),
+    db: DbSession = Depends(get_read_session),
+    current_user: TokenData = Depends(get_current_active_user)
+):
+    """Suggest courses as the user types, served from the in-memory index (all authenticated users)."""
+    return await run_in_session(db, course_service.autocomplete_courses, q, limit)
+
+
+@router.get("/availability", response_model=list[AvailabilityResponse])
+async def get_courses_availability(
+    ids: str | None = Query(default=None, description="Comma-separated course ids"),
+    semester: str | None = Query(default=None, description="Every course in a semester (e.g., 'Fall 2024')"),
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(get_current_active_user)
+):
+    """
+    Get seat availability for many courses in one request (all authenticated users).
+    
+    Pass `ids` for specific courses, `semester` for every course in a
+    semester, or both to restrict the ids to that semester. Unknown ids are
+    left out of the result.
+    """
+    if ids is None and semester is None:
+        raise bad_request("Pass ids, semester, or both")
+    course_ids = parse_course_ids(ids, settings.availability_batch_max_courses) if ids is not None else None
+    return await run_in_session(
+        db, enrollment_service.get_courses_availability, course_ids, semester=semester
+    )
+
+
+@router.get("/availability/stream")
+async def stream_availability(
+    request: Request,
+    ids: str = Query(..., description="Comma-separated course ids to watch"),
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(get_current_active_user)
+):
+    """
+    Stream seat availability for a set of courses as Server-Sent Events (all authenticated users).
+    
+    Sends one `availability` event per course with its current counts, then
+    another whenever a committed enrollment change alters a course's counts.
+    Idle streams receive a comment line every few seconds as a keepalive.
+    """
+    course_ids = parse_course_ids(ids, settings.availability_stream_max_courses)
+    # The stream outlives the request's session; give its connection back now
+    await release_session(db)
+    
+    async def events():
+        # Subscribe before reading the snapshot so no change falls in between
+        subscription = availability_broadcaster.subscribe(course_ids)
+        try:
+            async with session_scope() as snapshot_db:
+                snapshot = await run_in_session(
+                    snapshot_db, enrollment_service.get_courses_availability, course_ids
+                )
+            for availability in snapshot:
+                yield format_sse("availability", availability_event(
+                    availability["course_id"], availability["enrolled_count"], availability["max_students"]
+                ))
+            while not await request.is_disconnected():
+                try:
+                    changes = await asyncio.wait_for(
+                        subscription.wait(), timeout=settings.availability_stream_keepalive_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                for availability in changes:
+                    yield format_sse("availability", availability)
+        finally:
+            availability_broadcaster.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
 @router.get("/{course_id}", response_model=CourseResponse)
-def get_course(
+async def get_course(
     course_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: DbSession = Depends(get_read_session),
+    current_user: TokenData = Depends(get_current_active_user)
 ):
     """Get a course by ID (all authenticated users)."""
-    course = course_service.get_course_by_id(db, course_id)
+    course = await run_in_session(db, course_service.get_course_by_id, course_id)
     if not course:
         raise not_found("Course", course_id)
     return course
 
 
 @router.post("/", response_model=CourseResponse, status_code=201)
-def create_course(
+async def create_course(
     course: CourseCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles([UserRole.ADMIN, UserRole.FACULTY]))
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(require_roles([UserRole.ADMIN, UserRole.FACULTY]))
 ):
     """Create a new course (Admin and Faculty only)."""
     # Validate department exists
-    dept = department_service.get_department_by_id(db, course.department_id)
+    dept = await run_in_session(db, department_service.get_department_by_id, course.department_id)
     if not dept:
         raise bad_request(f"Department with id {course.department_id} does not exist")
     
     # Check for duplicate code
-    existing = course_service.get_course_by_code(db, course.code)
+    existing = await run_in_session(db, course_service.get_course_by_code, course.code)
     if existing:
         raise conflict(f"Course with code '{course.code}' already exists")
     
-    return course_service.create_course(db, course)
+    return await run_in_session(db, course_service.create_course, course)
 
 
 @router.put("/{course_id}", response_model=CourseResponse)
-def update_course(
+async def update_course(
     course_id: int,
     course: CourseUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles([UserRole.ADMIN, UserRole.FACULTY]))
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(require_roles([UserRole.ADMIN, UserRole.FACULTY]))
 ):
     """Update an existing course (Admin and Faculty only)."""
-    updated = course_service.update_course(db, course_id, course)
+    updated = await run_in_session(db, course_service.update_course, course_id, course)
     if not updated:
         raise not_found("Course", course_id)
+    
+    # Added seats go to waitlisted students first
+    if course.max_students is not None:
+        await run_in_session(db, enrollment_service.fill_from_waitlist, course_id)
     return updated
 
 
 @router.delete("/{course_id}", status_code=204)
-def delete_course(
+async def delete_course(
     course_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(UserRole.ADMIN))
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(require_role(UserRole.ADMIN))
 ):
     """Delete a course (Admin only)."""
-    deleted = course_service.delete_course(db, course_id)
+    deleted = await run_in_session(db, course_service.delete_course, course_id)
     if not deleted:
         raise not_found("Course", course_id)
 
 
 @router.get("/{course_id}/students", response_model=list[StudentResponse])
-def get_course_students(
+async def get_course_students(
     course_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles([UserRole.ADMIN, UserRole.FACULTY]))
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(require_roles([UserRole.ADMIN, UserRole.FACULTY]))
 ):
     """Get all actively enrolled students in a course (Admin and Faculty only)."""
-    course = course_service.get_course_by_id(db, course_id)
+    course = await run_in_session(db, course_service.get_course_by_id, course_id)
     if not course:
         raise not_found("Course", course_id)
-    return enrollment_service.get_students_in_course(db, course_id)
+    return await run_in_session(db, enrollment_service.get_students_in_course, course_id)
 
 
 @router.get("/{course_id}/availability", response_model=AvailabilityResponse)
-def get_course_availability(
+async def get_course_availability(
     course_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(get_current_active_user)
 ):
     """Get seat availability for a course (all authenticated users)."""
-    availability = enrollment_service.get_course_availability(db, course_id)
+    availability = await run_in_session(db, enrollment_service.get_course_availability, course_id)
     if not availability:
         raise not_found("Course", course_id)
     return availability
 
+
+@router.get("/{course_id}/waitlist", response_model=list[WaitlistEntryResponse])
+async def get_course_waitlist(
+    course_id: int,
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(require_roles([UserRole.ADMIN, UserRole.FACULTY]))
+):
+    """Get a course's waitlist in promotion order (Admin and Faculty only)."""
+    existing = await run_in_session(db, course_service.get_course_by_id, course_id)
+    if not existing:
+        raise not_found("Course", course_id)
+    return await run_in_session(db, waitlist_service.get_course_waitlist, course_id)
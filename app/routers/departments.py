@@ -2,37 +2,37 @@
 Department API routes
 """
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import DbSession, get_read_session, get_session, run_in_session
 from app.schemas.department import DepartmentCreate, DepartmentResponse
 from app.services import department_service
 from app.exceptions import conflict
 from app.middleware.auth import get_current_active_user, require_role
-from app.models.user import User, UserRole
+from app.models.user import UserRole
+from app.schemas.user import TokenData
 
 router = APIRouter(prefix="/api/departments", tags=["departments"])
 
 
 @router.get("/", response_model=list[DepartmentResponse])
-def list_departments(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+async def list_departments(
+    db: DbSession = Depends(get_read_session),
+    current_user: TokenData = Depends(get_current_active_user)
 ):
     """Get all departments (all authenticated users)."""
-    return department_service.get_all_departments(db)
+    return await run_in_session(db, department_service.get_all_departments)
 
 
 @router.post("/", response_model=DepartmentResponse, status_code=201)
-def create_department(
+async def create_department(
     department: DepartmentCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(UserRole.ADMIN))
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(require_role(UserRole.ADMIN))
 ):
     """Create a new department (Admin only)."""
     # Check for duplicate code
-    existing = department_service.get_department_by_code(db, department.code)
+    existing = await run_in_session(db, department_service.get_department_by_code, department.code)
     if existing:
         raise conflict(f"Department with code '{department.code}' already exists")
-    return department_service.create_department(db, department)
+    return await run_in_session(db, department_service.create_department, department)
 
@@ -2,23 +2,34 @@
 Enrollment API routes
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.schemas.enrollment import EnrollmentCreate, EnrollmentResponse
+from app.admission import admission_queue
+from app.config import get_settings
+from app.database import DbSession, get_session, run_in_session
+from app.schemas.enrollment import (
+    BulkEnrollmentRequest,
+    BulkEnrollmentResponse,
+    EnrollmentCreate,
+    EnrollmentResponse,
+    EnrollmentSwap,
+)
 from app.services import enrollment_service
 from app.exceptions import not_found
 from app.middleware.auth import get_current_active_user, require_role, require_roles
-from app.models.user import User, UserRole
+from app.models.user import UserRole
+from app.schemas.user import TokenData
+
+# Get settings
+settings = get_settings()
 
 router = APIRouter(prefix="/api/enrollments", tags=["enrollments"])
 
 
 @router.post("/", response_model=EnrollmentResponse, status_code=201)
-def create_enrollment(
+async def create_enrollment(
     enrollment: EnrollmentCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(get_current_active_user)
 ):
     """
     Enroll a student in a course.
@@ -31,6 +42,9 @@ def create_enrollment(
     - Cannot enroll if already actively enrolled (409)
     - Cannot enroll if course is full (409)
     - Re-enrolling after dropping reactivates the existing record
+    
+    With ENROLLMENT_BATCHING enabled, concurrent requests for the same course
+    are validated and committed together as one batch.
     """
     # Students can only enroll themselves
     if current_user.role == UserRole.STUDENT.value:
@@ -40,14 +54,73 @@ def create_enrollment(
                 detail="Students can only enroll themselves"
             )
     
-    return enrollment_service.create_enrollment(db, enrollment)
+    if settings.enrollment_batching:
+        return await admission_queue.submit(enrollment)
+    return await run_in_session(db, enrollment_service.create_enrollment, enrollment)
+
+
+@router.post("/bulk", response_model=BulkEnrollmentResponse)
+async def bulk_enroll(
+    request: BulkEnrollmentRequest,
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(require_roles([UserRole.ADMIN, UserRole.FACULTY]))
+):
+    """
+    Enroll many (student, course) pairs in one request (Admin/Faculty).
+    
+    Students, courses, prerequisites and existing enrollments are loaded once
+    for the whole request and every item is checked against the same rules as
+    a single enrollment. Each item reports its own outcome.
+    
+    - best_effort: every valid item is committed
+    - all_or_nothing: nothing is committed unless every item is valid;
+      valid items are then reported as "skipped"
+    """
+    outcome = await run_in_session(
+        db, enrollment_service.bulk_enroll, request.items,
+        all_or_nothing=request.mode == "all_or_nothing"
+    )
+    return {"mode": request.mode, **outcome}
+
+
+@router.post("/swap", response_model=EnrollmentResponse)
+async def swap_enrollment(
+    swap: EnrollmentSwap,
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(get_current_active_user)
+):
+    """
+    Drop an enrollment and enroll in another course in one transaction.
+    
+    Students can only swap their own enrollments. Admin/Faculty can swap any enrollment.
+    
+    The new course is subject to the usual prerequisite and seat rules (the
+    dropped course does not count as a prerequisite). If it cannot be joined,
+    nothing changes and the original seat is kept. Returns the new enrollment.
+    """
+    enrollment = await run_in_session(db, enrollment_service.get_enrollment_by_id, swap.enrollment_id)
+    if not enrollment:
+        raise not_found("Enrollment", swap.enrollment_id)
+    
+    # Students can only swap their own enrollments
+    if current_user.role == UserRole.STUDENT.value:
+        if current_user.student_id != enrollment.student_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Students can only swap their own enrollments"
+            )
+    
+    result = await run_in_session(db, enrollment_service.swap_enrollment, swap.enrollment_id, swap.course_id)
+    if not result:
+        raise not_found("Enrollment", swap.enrollment_id)
+    return result
 
 
 @router.delete("/{enrollment_id}", status_code=204)
-def drop_enrollment(
+async def drop_enrollment(
     enrollment_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(get_current_active_user)
 ):
     """
     Drop an enrollment (soft delete).
@@ -57,7 +130,7 @@ def drop_enrollment(
     Changes status to "dropped" instead of deleting the record.
     """
     # Get enrollment to check ownership
-    enrollment = enrollment_service.get_enrollment_by_id(db, enrollment_id)
+    enrollment = await run_in_session(db, enrollment_service.get_enrollment_by_id, enrollment_id)
     if not enrollment:
         raise not_found("Enrollment", enrollment_id)
     
@@ -69,7 +142,7 @@ def drop_enrollment(
                 detail="Students can only drop their own enrollments"
             )
     
-    result = enrollment_service.drop_enrollment(db, enrollment_id)
+    result = await run_in_session(db, enrollment_service.drop_enrollment, enrollment_id)
     if not result:
         raise not_found("Enrollment", enrollment_id)
 
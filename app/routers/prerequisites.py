@@ -1,90 +1,120 @@
 """
 Prerequisite API routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Literal
 
-from app.database import get_db
-from app.schemas.prerequisite import PrerequisiteCreate, PrerequisiteResponse, PrerequisiteChain
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.database import DbSession, get_read_session, get_session, run_in_session
+from app.schemas.prerequisite import (
+    PrerequisiteBulkImport,
+    PrerequisiteBulkImportResult,
+    PrerequisiteChain,
+    PrerequisiteChainGraph,
+    PrerequisiteCreate,
+    PrerequisiteResponse,
+)
 from app.services import prerequisite_service, course_service
 from app.exceptions import not_found
 from app.middleware.auth import get_current_active_user, require_roles
-from app.models.user import User, UserRole
+from app.models.user import UserRole
+from app.schemas.user import TokenData
 
 router = APIRouter(prefix="/api/courses", tags=["prerequisites"])
 
 
+@router.post("/prerequisites/bulk", response_model=PrerequisiteBulkImportResult)
+async def bulk_add_prerequisites(
+    request: PrerequisiteBulkImport,
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(require_roles([UserRole.ADMIN, UserRole.FACULTY]))
+):
+    """
+    Add many prerequisites in one transaction (Admin and Faculty only).
+    
+    The whole edge list is checked against the existing graph at once; if it
+    would create circular dependencies, every cycle is reported and nothing
+    is inserted. Edges that already exist are skipped. Also available as
+    `python scripts/import_prerequisites.py`.
+    """
+    return await run_in_session(
+        db, prerequisite_service.bulk_add_prerequisites, request.edges, dry_run=request.dry_run
+    )
+
+
 @router.post("/{course_id}/prerequisites", response_model=PrerequisiteResponse, status_code=201)
-def add_prerequisite(
+async def add_prerequisite(
     course_id: int,
     prerequisite_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles([UserRole.ADMIN, UserRole.FACULTY]))
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(require_roles([UserRole.ADMIN, UserRole.FACULTY]))
 ):
     """Add a prerequisite to a course (Admin and Faculty only)."""
     # Validate course exists
-    course = course_service.get_course_by_id(db, course_id)
+    course = await run_in_session(db, course_service.get_course_by_id, course_id)
     if not course:
         raise not_found("Course", course_id)
     
     prerequisite = PrerequisiteCreate(course_id=course_id, prerequisite_id=prerequisite_id)
-    return prerequisite_service.add_prerequisite(db, prerequisite)
+    return await run_in_session(db, prerequisite_service.add_prerequisite, prerequisite)
 
 
 @router.delete("/{course_id}/prerequisites/{prerequisite_id}", status_code=204)
-def remove_prerequisite(
+async def remove_prerequisite(
     course_id: int,
     prerequisite_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles([UserRole.ADMIN, UserRole.FACULTY]))
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(require_roles([UserRole.ADMIN, UserRole.FACULTY]))
 ):
     """Remove a prerequisite from a course (Admin and Faculty only)."""
     # Validate course exists
-    course = course_service.get_course_by_id(db, course_id)
+    course = await run_in_session(db, course_service.get_course_by_id, course_id)
     if not course:
         raise not_found("Course", course_id)
     
-    result = prerequisite_service.remove_prerequisite(db, course_id, prerequisite_id)
+    result = await run_in_session(db, prerequisite_service.remove_prerequisite, course_id, prerequisite_id)
     if not result:
         raise not_found("Prerequisite", prerequisite_id)
 
 
 @router.get("/{course_id}/prerequisites", response_model=list[PrerequisiteResponse])
-def get_prerequisites(
+async def get_prerequisites(
     course_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: DbSession = Depends(get_read_session),
+    current_user: TokenData = Depends(get_current_active_user)
 ):
     """Get all direct prerequisites for a course (all authenticated users)."""
-    course = course_service.get_course_by_id(db, course_id)
+    course = await run_in_session(db, course_service.get_course_by_id, course_id)
     if not course:
         raise not_found("Course", course_id)
     
-    direct_prereqs = prerequisite_service.get_direct_prerequisites(db, course_id)
-    # Convert to PrerequisiteResponse format
-    prerequisites = []
-    for prereq in direct_prereqs:
-        prereq_rel = prerequisite_service.get_prerequisite_by_course_and_prerequisite(
-            db, course_id, prereq.id
-        )
-        if prereq_rel:
-            prerequisites.append(prereq_rel)
-    
-    return prerequisites
+    return await run_in_session(db, prerequisite_service.get_prerequisite_relations, course_id)
 
 
-@router.get("/{course_id}/prerequisites/chain", response_model=PrerequisiteChain)
-def get_prerequisite_chain(
+@router.get("/{course_id}/prerequisites/chain", response_model=PrerequisiteChain | PrerequisiteChainGraph)
+async def get_prerequisite_chain(
     course_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    format: Literal["nested", "graph"] = Query(
+        default="nested", description="nested: tree of courses; graph: each course once plus an edge list"
+    ),
+    max_depth: int | None = Query(default=None, ge=0, description="Levels of prerequisites to include (default: all)"),
+    db: DbSession = Depends(get_read_session),
+    current_user: TokenData = Depends(get_current_active_user)
 ):
-    """Get full prerequisite chain for a course (all authenticated users)."""
-    course = course_service.get_course_by_id(db, course_id)
+    """
+    Get full prerequisite chain for a course (all authenticated users).
+    
+    The nested format repeats a prerequisite under every course that needs
+    it, so on curricula with many shared prerequisites prefer format=graph.
+    """
+    course = await run_in_session(db, course_service.get_course_by_id, course_id)
     if not course:
         raise not_found("Course", course_id)
     
-    chain = prerequisite_service.get_prerequisite_chain(db, course_id)
+    if format == "graph":
+        chain = await run_in_session(db, prerequisite_service.get_prerequisite_graph, course_id, max_depth)
+    else:
+        chain = await run_in_session(db, prerequisite_service.get_prerequisite_chain, course_id, max_depth)
     if not chain:
         raise not_found("Course", course_id)
     
@@ -92,23 +122,23 @@ def get_prerequisite_chain(
 
 
 @router.get("/{course_id}/prerequisites/check/{student_id}")
-def check_prerequisites(
+async def check_prerequisites(
     course_id: int,
     student_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(get_current_active_user)
 ):
     """Check if a student meets all prerequisites for a course (all authenticated users)."""
-    course = course_service.get_course_by_id(db, course_id)
+    course = await run_in_session(db, course_service.get_course_by_id, course_id)
     if not course:
         raise not_found("Course", course_id)
     
     from app.services import student_service
-    student = student_service.get_student_by_id(db, student_id)
+    student = await run_in_session(db, student_service.get_student_by_id, student_id)
     if not student:
         raise not_found("Student", student_id)
     
-    all_met, missing = prerequisite_service.check_prerequisites_met(db, student_id, course_id)
+    all_met, missing = await run_in_session(db, prerequisite_service.check_prerequisites_met, student_id, course_id)
     
     return {
         "course_id": course_id,
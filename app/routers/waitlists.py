@@ -0,0 +1,68 @@
+"""
+Waitlist API routes
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.database import DbSession, get_session, run_in_session
+from app.schemas.waitlist import WaitlistCreate, WaitlistEntryResponse
+from app.services import waitlist_service
+from app.exceptions import not_found
+from app.middleware.auth import get_current_active_user
+from app.models.user import UserRole
+from app.schemas.user import TokenData
+
+router = APIRouter(prefix="/api/waitlist", tags=["waitlist"])
+
+
+@router.post("/", response_model=WaitlistEntryResponse, status_code=201)
+async def join_waitlist(
+    waitlist: WaitlistCreate,
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(get_current_active_user)
+):
+    """
+    Join the waitlist of a full course.
+    
+    Students can only add themselves. Admin/Faculty can add any student.
+    
+    When a seat opens (a drop or swap), the first student in line is enrolled
+    automatically in the same transaction, so there is no need to poll
+    availability. Joining a course with open seats is rejected (409).
+    """
+    # Students can only add themselves
+    if current_user.role == UserRole.STUDENT.value:
+        if current_user.student_id != waitlist.student_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Students can only add themselves to a waitlist"
+            )
+    
+    return await run_in_session(db, waitlist_service.join_waitlist, waitlist)
+
+
+@router.delete("/{entry_id}", status_code=204)
+async def leave_waitlist(
+    entry_id: int,
+    db: DbSession = Depends(get_session),
+    current_user: TokenData = Depends(get_current_active_user)
+):
+    """
+    Leave a waitlist.
+    
+    Students can only remove their own entries. Admin/Faculty can remove any entry.
+    """
+    entry = await run_in_session(db, waitlist_service.get_waitlist_entry_by_id, entry_id)
+    if not entry:
+        raise not_found("Waitlist entry", entry_id)
+    
+    # Students can only remove their own entries
+    if current_user.role == UserRole.STUDENT.value:
+        if current_user.student_id != entry.student_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Students can only remove their own waitlist entries"
+            )
+    
+    removed = await run_in_session(db, waitlist_service.leave_waitlist, entry_id)
+    if not removed:
+        raise not_found("Waitlist entry", entry_id)
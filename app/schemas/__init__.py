@@ -2,10 +2,26 @@
 Pydantic schemas for request/response validation
 """
 from app.schemas.department import DepartmentCreate, DepartmentResponse
-from app.schemas.course import CourseCreate, CourseUpdate, CourseResponse
+from app.schemas.course import CourseCreate, CourseUpdate, CourseResponse, CourseSearchResult, CourseSuggestion
 from app.schemas.student import StudentCreate, StudentResponse
-from app.schemas.enrollment import EnrollmentCreate, EnrollmentResponse, AvailabilityResponse
-from app.schemas.user import UserCreate, UserResponse, UserLogin, Token, TokenData
+from app.schemas.enrollment import (
+    EnrollmentCreate,
+    EnrollmentResponse,
+    EnrollmentSwap,
+    AvailabilityResponse,
+    BulkEnrollmentRequest,
+    BulkEnrollmentItemResult,
+    BulkEnrollmentResponse,
+)
+from app.schemas.user import (
+    UserCreate,
+    UserResponse,
+    UserLogin,
+    UserRoleUpdate,
+    PasswordChange,
+    Token,
+    TokenData,
+)
 from app.schemas.common import (
     PaginationParams,
     PaginatedResponse,
@@ -14,6 +30,18 @@ from app.schemas.common import (
     StudentFilterParams,
     StudentSortParams
 )
+from app.schemas.prerequisite import (
+    PrerequisiteCreate,
+    PrerequisiteResponse,
+    PrerequisiteChain,
+    PrerequisiteChainNode,
+    PrerequisiteChainEdge,
+    PrerequisiteChainGraph,
+    PrerequisiteBulkImport,
+    PrerequisiteBulkImportResult,
+)
+from app.schemas.waitlist import WaitlistCreate, WaitlistEntryResponse
+from app.schemas.admin import PoolStatus, CacheStats, EnrolledCountDrift, EnrolledCountReconciliation
 
 __all__ = [
     "DepartmentCreate",
@@ -21,14 +49,22 @@ __all__ = [
     "CourseCreate",
     "CourseUpdate",
     "CourseResponse",
+    "CourseSearchResult",
+    "CourseSuggestion",
     "StudentCreate",
     "StudentResponse",
     "EnrollmentCreate",
     "EnrollmentResponse",
+    "EnrollmentSwap",
+    "BulkEnrollmentRequest",
+    "BulkEnrollmentItemResult",
+    "BulkEnrollmentResponse",
     "AvailabilityResponse",
     "UserCreate",
     "UserResponse",
     "UserLogin",
+    "UserRoleUpdate",
+    "PasswordChange",
     "Token",
     "TokenData",
     "PaginationParams",
@@ -37,15 +73,18 @@ __all__ = [
     "CourseSortParams",
     "StudentFilterParams",
     "StudentSortParams",
-]
-from app.schemas.prerequisite import (
-    PrerequisiteCreate,
-    PrerequisiteResponse,
-    PrerequisiteChain
-)
-
-__all__.extend([
     "PrerequisiteCreate",
     "PrerequisiteResponse",
     "PrerequisiteChain",
-])
\ No newline at end of file
+    "PrerequisiteChainNode",
+    "PrerequisiteChainEdge",
+    "PrerequisiteChainGraph",
+    "PrerequisiteBulkImport",
+    "PrerequisiteBulkImportResult",
+    "WaitlistCreate",
+    "WaitlistEntryResponse",
+    "PoolStatus",
+    "CacheStats",
+    "EnrolledCountDrift",
+    "EnrolledCountReconciliation",
+]
@@ -0,0 +1,61 @@
+"""
+Admin and monitoring schemas
+"""
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class WaitBucket(BaseModel):
+    """Cumulative histogram bucket."""
+    
+    le: Optional[float] = Field(description="Upper bound in seconds (null for +Inf)")
+    count: int
+
+
+class WaitTimeHistogram(BaseModel):
+    """Connection checkout wait-time histogram."""
+    
+    buckets: list[WaitBucket]
+    count: int
+    sum_seconds: float
+    timeouts: int
+
+
+class PoolStatus(BaseModel):
+    """Live status of one engine's connection pool."""
+    
+    name: str
+    pool_class: str
+    size: Optional[int] = None
+    checked_out: Optional[int] = None
+    idle: Optional[int] = None
+    overflow: Optional[int] = None
+    wait_time: Optional[WaitTimeHistogram] = None
+
+
+class CacheStats(BaseModel):
+    """Size and hit/miss counters of one cache."""
+    
+    name: str
+    backend: str
+    size: Optional[int] = Field(default=None, description="Entries held (null if the backend is unreachable)")
+    maxsize: Optional[int] = Field(default=None, description="Entry limit (null when the backend bounds memory itself)")
+    hits: int
+    misses: int
+    errors: int = 0
+
+
+class EnrolledCountDrift(BaseModel):
+    """A course whose stored enrolled_count disagreed with its active enrollments."""
+    
+    course_id: int
+    course_code: str
+    stored_count: int
+    actual_count: int
+
+
+class EnrolledCountReconciliation(BaseModel):
+    """Result of an enrolled_count reconciliation run."""
+    
+    repaired: bool
+    drifted: list[EnrolledCountDrift]
@@ -12,27 +12,56 @@ class PaginationParams(BaseModel):
     
     page: int = Field(default=1, ge=1, description="Page number (1-indexed)")
     page_size: int = Field(default=20, ge=1, le=100, description="Number of items per page")
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Keyset pagination cursor from a previous next_cursor; pass an empty value to start. "
+                    "When set, page is ignored"
+    )
+    total_mode: str = Field(
+        default="exact",
+        pattern="^(exact|estimated|none)$",
+        description="How to compute total: exact (COUNT every request), estimated (cached/planner estimate), "
+                    "or none (skip the count)"
+    )
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
     """Paginated response wrapper."""
     
     items: list[T]
-    total: int = Field(description="Total number of items")
+    total: Optional[int] = Field(description="Total number of items (null when total_mode=none)")
     page: int = Field(description="Current page number")
     page_size: int = Field(description="Number of items per page")
-    total_pages: int = Field(description="Total number of pages")
+    total_pages: Optional[int] = Field(description="Total number of pages (null when total_mode=none)")
+    total_mode: str = Field(default="exact", description="How total was computed: exact, estimated, or none")
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor for the next page (keyset mode only; null on the last page)"
+    )
     
     @classmethod
-    def create(cls, items: list[T], total: int, page: int, page_size: int):
+    def create(
+        cls,
+        items: list[T],
+        total: int | None,
+        page: int,
+        page_size: int,
+        next_cursor: str | None = None,
+        total_mode: str = "exact"
+    ):
         """Create a paginated response."""
-        total_pages = (total + page_size - 1) // page_size if total > 0 else 0
+        if total is None:
+            total_pages = None
+        else:
+            total_pages = (total + page_size - 1) // page_size if total > 0 else 0
         return cls(
             items=items,
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            total_mode=total_mode,
+            next_cursor=next_cursor
         )
 
 
@@ -37,3 +37,19 @@ class CourseResponse(CourseBase):
     
     model_config = ConfigDict(from_attributes=True)
 
+
+class CourseSearchResult(CourseResponse):
+    """Schema for a ranked course search hit."""
+    
+    rank: float
+    headline: str = Field(description="Course code and name with matched terms wrapped in <b> tags")
+
+
+class CourseSuggestion(BaseModel):
+    """Schema for an autocomplete suggestion."""
+    
+    id: int
+    code: str
+    name: str
+    
+    model_config = ConfigDict(from_attributes=True)
@@ -2,8 +2,9 @@
 Enrollment Pydantic schemas
 """
 from datetime import datetime
+from typing import Literal, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class EnrollmentCreate(BaseModel):
@@ -13,6 +14,13 @@ class EnrollmentCreate(BaseModel):
     course_id: int
 
 
+class EnrollmentSwap(BaseModel):
+    """Schema for swapping an enrollment into another course."""
+    
+    enrollment_id: int = Field(description="Active enrollment to drop")
+    course_id: int = Field(description="Course to enroll in instead")
+
+
 class EnrollmentResponse(BaseModel):
     """Schema for enrollment response."""
     
@@ -34,3 +42,37 @@ class AvailabilityResponse(BaseModel):
     enrolled_count: int
     available_seats: int
 
+
+
+class BulkEnrollmentRequest(BaseModel):
+    """Schema for enrolling many (student, course) pairs at once."""
+    
+    items: list[EnrollmentCreate] = Field(..., min_length=1, max_length=1000)
+    mode: Literal["all_or_nothing", "best_effort"] = Field(
+        default="best_effort",
+        description="all_or_nothing commits nothing if any item fails; best_effort commits every valid item"
+    )
+
+
+class BulkEnrollmentItemResult(BaseModel):
+    """Outcome of one item of a bulk enrollment."""
+    
+    index: int
+    student_id: int
+    course_id: int
+    status: Literal["enrolled", "failed", "skipped"] = Field(
+        description="skipped: valid, but not committed because another item failed (all_or_nothing)"
+    )
+    status_code: int = Field(description="HTTP status the item would have received on its own")
+    detail: Optional[str] = None
+    enrollment: Optional[EnrollmentResponse] = None
+
+
+class BulkEnrollmentResponse(BaseModel):
+    """Schema for bulk enrollment results."""
+    
+    mode: str
+    committed: bool
+    enrolled: int
+    failed: int
+    results: list[BulkEnrollmentItemResult]
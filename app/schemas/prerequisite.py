@@ -2,7 +2,7 @@
 Prerequisite schemas
 """
 from typing import Optional
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from app.schemas.course import CourseResponse
 
@@ -28,6 +28,21 @@ class PrerequisiteCreate(PrerequisiteBase):
     pass
 
 
+class PrerequisiteBulkImport(BaseModel):
+    """Schema for adding many prerequisite relationships at once."""
+    
+    edges: list[PrerequisiteCreate] = Field(..., min_length=1, max_length=10000)
+    dry_run: bool = Field(default=False, description="Validate the edges without inserting them")
+
+
+class PrerequisiteBulkImportResult(BaseModel):
+    """Schema for bulk prerequisite import results."""
+    
+    created: int = Field(description="Edges inserted (or that would be, with dry_run)")
+    skipped: int = Field(description="Edges that already existed or were repeated in the request")
+    committed: bool
+
+
 class PrerequisiteResponse(PrerequisiteBase):
     """Schema for prerequisite response."""
     
@@ -45,9 +60,35 @@ class PrerequisiteChain(BaseModel):
     course_code: str
     course_name: str
     direct_prerequisites: list['PrerequisiteChain']
+    truncated: bool = Field(default=False, description="Prerequisites beyond max_depth were omitted")
     
     model_config = ConfigDict(from_attributes=True)
 
 
 # Allow forward references for recursive structure
 PrerequisiteChain.model_rebuild()
+
+
+class PrerequisiteChainNode(BaseModel):
+    """A course in a prerequisite graph."""
+    
+    course_id: int
+    course_code: str
+    course_name: str
+    depth: int = Field(description="Shortest prerequisite distance from the requested course (0 = itself)")
+    truncated: bool = Field(default=False, description="Prerequisites beyond max_depth were omitted")
+
+
+class PrerequisiteChainEdge(BaseModel):
+    """A direct prerequisite relationship in a prerequisite graph."""
+    
+    course_id: int
+    prerequisite_id: int
+
+
+class PrerequisiteChainGraph(BaseModel):
+    """Schema for a prerequisite chain as deduplicated nodes and edges."""
+    
+    course_id: int
+    nodes: list[PrerequisiteChainNode]
+    edges: list[PrerequisiteChainEdge]
@@ -28,6 +28,19 @@ class UserLogin(BaseModel):
     password: str
 
 
+class UserRoleUpdate(BaseModel):
+    """Schema for changing a user's role."""
+    
+    role: UserRole
+
+
+class PasswordChange(BaseModel):
+    """Schema for changing the current user's password."""
+    
+    current_password: str
+    new_password: str = Field(..., min_length=8, max_length=100)
+
+
 class UserResponse(UserBase):
     """Schema for user response (excludes password)."""
     
@@ -46,7 +59,15 @@ class Token(BaseModel):
 
 
 class TokenData(BaseModel):
-    """Schema for JWT token payload data."""
+    """
+    Schema for JWT token payload data.
+    
+    Also serves as the authenticated principal: it is built from the signed
+    claims alone, so resolving the current user does not load the User row.
+    """
     
     email: str | None = None
     role: str | None = None
+    user_id: int | None = None
+    student_id: int | None = None
+    token_version: int | None = None
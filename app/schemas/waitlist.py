@@ -0,0 +1,23 @@
+"""
+Waitlist Pydantic schemas
+"""
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class WaitlistCreate(BaseModel):
+    """Schema for joining a course's waitlist."""
+    
+    student_id: int
+    course_id: int
+
+
+class WaitlistEntryResponse(BaseModel):
+    """Schema for a waitlist entry."""
+    
+    id: int
+    student_id: int
+    course_id: int
+    joined_at: datetime
+    place: int = Field(description="Place in the queue; 1 is promoted when the next seat opens")
@@ -0,0 +1,75 @@
+"""
+Search helpers shared by the list services
+"""
+import html
+import re
+
+from sqlalchemy import func, or_
+
+LIKE_ESCAPE = "\\"
+
+# html.escape(quote=True) replacements, & first so later entities are not re-escaped
+HTML_ESCAPES = [("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;")]
+
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards so user input only matches literally."""
+    return (
+        term.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace("%", LIKE_ESCAPE + "%")
+        .replace("_", LIKE_ESCAPE + "_")
+    )
+
+
+def substring_filter(term: str, *columns):
+    """
+    Case-insensitive substring match of term against any of the columns.
+    
+    On PostgreSQL this compiles to ILIKE '%term%', which the pg_trgm GIN
+    indexes serve (BitmapOr across columns). SQLite falls back to
+    lower(column) LIKE lower(pattern), a plain scan.
+    """
+    pattern = f"%{escape_like(term.strip())}%"
+    return or_(*(column.ilike(pattern, escape=LIKE_ESCAPE) for column in columns))
+
+
+def search_terms(text: str) -> list[str]:
+    """Split free text into lowercase word terms (letters, digits, underscore)."""
+    return re.findall(r"\w+", text.lower())
+
+
+def prefix_tsquery(terms: list[str]) -> str:
+    """
+    Build to_tsquery() input that matches every term as a prefix.
+    
+    Terms come from search_terms, so they cannot contain tsquery operators.
+    Prefix matching lets "cmpe2" find "CMPE201" as the user types.
+    """
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def escape_html(expression):
+    """SQL equivalent of html.escape() for a string column expression."""
+    for char, entity in HTML_ESCAPES:
+        expression = func.replace(expression, char, entity)
+    return expression
+
+
+def highlight(text: str, terms: list[str]) -> str:
+    """
+    HTML-escape text and wrap term matches in <b> tags (used where
+    ts_headline is unavailable).
+    
+    Matching runs on the raw text, so a term can never split an entity.
+    """
+    if not terms:
+        return html.escape(text)
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+    parts = []
+    position = 0
+    for match in pattern.finditer(text):
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append(f"<b>{html.escape(match.group(0))}</b>")
+        position = match.end()
+    parts.append(html.escape(text[position:]))
+    return "".join(parts)
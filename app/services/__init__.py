@@ -7,7 +7,8 @@ from app.services import (
     student_service,
     enrollment_service,
     auth_service,
-    prerequisite_service
+    prerequisite_service,
+    waitlist_service
 )
 
 __all__ = [
@@ -16,5 +17,6 @@ __all__ = [
     "student_service",
     "enrollment_service",
     "auth_service",
-    "prerequisite_service"
+    "prerequisite_service",
+    "waitlist_service"
 ]
@@ -8,13 +8,20 @@ from jose import JWTError, jwt
 import bcrypt
 from sqlalchemy.orm import Session
 
+from app.cache import TTLCache
 from app.config import get_settings
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.schemas.user import UserCreate
 
 # Get settings
 settings = get_settings()
 
+# user_id -> current token version, so authenticated requests rarely touch the users table
+token_version_cache = TTLCache(
+    maxsize=settings.token_version_cache_size,
+    ttl=settings.token_version_cache_ttl_seconds
+)
+
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt."""
@@ -53,6 +60,35 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def build_token_claims(user: User) -> dict:
+    """Build the JWT claims that identify a user without a database lookup."""
+    return {
+        "sub": user.email,
+        "uid": user.id,
+        "role": user.role,  # role is already a string
+        "student_id": user.student_id,
+        "ver": user.token_version,
+    }
+
+
+def load_token_version(db: Session, user_id: int) -> Optional[int]:
+    """Load a user's token version from the database and refresh the cache."""
+    version = db.query(User.token_version).filter(User.id == user_id).scalar()
+    if version is not None:
+        token_version_cache.set(user_id, version)
+    return version
+
+
+def revoke_tokens(db: Session, user: User) -> None:
+    """
+    Invalidate all outstanding tokens for a user by bumping their token version.
+    
+    The caller is responsible for committing.
+    """
+    user.token_version = User.token_version + 1
+    token_version_cache.delete(user.id)
+
+
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     """Get a user by email address."""
     return db.query(User).filter(User.email == email).first()
@@ -68,9 +104,12 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     return user
 
 
-def create_user(db: Session, user_create: UserCreate) -> User:
-    """Create a new user with hashed password."""
-    hashed_password = hash_password(user_create.password)
+def create_user(db: Session, user_create: UserCreate, hashed_password: str) -> User:
+    """
+    Create a new user with an already hashed password.
+    
+    Callers hash with hash_password off the event loop (bcrypt is slow).
+    """
     db_user = User(
         email=user_create.email,
         hashed_password=hashed_password,
@@ -86,3 +125,28 @@ def create_user(db: Session, user_create: UserCreate) -> User:
 def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
     """Get a user by ID."""
     return db.query(User).filter(User.id == user_id).first()
+
+
+def get_user_by_student_id(db: Session, student_id: int) -> Optional[User]:
+    """Get the user account linked to a student."""
+    return db.query(User).filter(User.student_id == student_id).first()
+
+
+def update_user_role(db: Session, user: User, role: UserRole) -> User:
+    """Change a user's role and revoke their existing tokens."""
+    user.role = role.value
+    revoke_tokens(db, user)
+    db.commit()
+    db.refresh(user)
+    token_version_cache.delete(user.id)
+    return user
+
+
+def update_user_password(db: Session, user: User, hashed_password: str) -> User:
+    """Store a user's new (already hashed) password and revoke their existing tokens."""
+    user.hashed_password = hashed_password
+    revoke_tokens(db, user)
+    db.commit()
+    db.refresh(user)
+    token_version_cache.delete(user.id)
+    return user
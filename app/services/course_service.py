@@ -1,12 +1,17 @@
 """
 Course service layer for business logic
 """
-from sqlalchemy import func, or_
+from sqlalchemy import func, literal_column
 from sqlalchemy.orm import Session
 
+from app.autocomplete import COURSES_VERSION_NAME, Suggestion, course_index
+from app.broadcast import availability_cache, record_seat_change
+from app.cache_versions import bump_version
 from app.models.course import Course
 from app.models.department import Department
+from app.pagination import apply_sort, count_total, fetch_keyset_page
 from app.schemas.course import CourseCreate, CourseUpdate
+from app.search import escape_html, highlight, prefix_tsquery, search_terms, substring_filter
 
 
 def get_all_courses(
@@ -18,13 +23,18 @@ def get_all_courses(
     semester: str | None = None,
     search: str | None = None,
     sort_by: str = "name",
-    sort_order: str = "asc"
-) -> tuple[list[Course], int]:
+    sort_order: str = "asc",
+    cursor: str | None = None,
+    total_mode: str = "exact"
+) -> tuple[list[Course], int, str | None]:
     """
     Get all courses with pagination, filtering, sorting, and search.
     
+    Pages by page number, or by keyset when a cursor is given (an empty
+    cursor starts at the first page).
+    
     Returns:
-        tuple: (list of courses, total count)
+        tuple: (list of courses, total count or None, next cursor or None)
     """
     query = db.query(Course)
     
@@ -38,16 +48,10 @@ def get_all_courses(
         query = query.filter(Course.semester == semester)
     
     if search:
-        search_pattern = f"%{search}%"
-        query = query.filter(
-            or_(
-                Course.code.ilike(search_pattern),
-                Course.name.ilike(search_pattern)
-            )
-        )
+        query = query.filter(substring_filter(search, Course.code, Course.name))
     
     # Get total count before pagination
-    total = query.count()
+    total = count_total(query, total_mode, ("courses", dept_code.upper() if dept_code else None, dept_id, semester, search))
     
     # Apply sorting
     sort_column = None
@@ -62,16 +66,89 @@ def get_all_courses(
     else:
         sort_column = Course.name  # Default
     
-    if sort_order == "desc":
-        query = query.order_by(sort_column.desc())
-    else:
-        query = query.order_by(sort_column.asc())
+    # Keyset pagination: seek past the cursor instead of skipping rows
+    if cursor is not None:
+        courses, next_cursor = fetch_keyset_page(
+            query, sort_column, Course.id, sort_by, sort_order, cursor, page_size
+        )
+        return courses, total, next_cursor
+    
+    query = apply_sort(query, sort_column, Course.id, sort_order)
     
     # Apply pagination
     offset = (page - 1) * page_size
     courses = query.offset(offset).limit(page_size).all()
     
-    return courses, total
+    return courses, total, None
+
+
+def search_courses(
+    db: Session,
+    q: str,
+    dept_id: int | None = None,
+    semester: str | None = None,
+    limit: int = 20
+) -> list[tuple[Course, float, str]]:
+    """
+    Ranked full-text search over course code, name and department name.
+    
+    On PostgreSQL, matching, ranking and highlighting happen in one query
+    against the GIN-indexed courses.search_vector column. Other databases
+    use a substring fallback ranked in Python.
+    
+    Returns:
+        list: (course, rank, headline) tuples, best match first
+    """
+    terms = search_terms(q)
+    if not terms:
+        return []
+    
+    if db.get_bind().dialect.name != "postgresql":
+        return _search_courses_fallback(db, terms, dept_id, semester, limit)
+    
+    ts_query = func.to_tsquery("english", prefix_tsquery(terms))
+    search_vector = literal_column("courses.search_vector")
+    rank = func.ts_rank(search_vector, ts_query)
+    # Escape before highlighting so the <b> tags are the only markup in the headline;
+    # the parser reads entities as single tokens, so matches never split one
+    headline = func.ts_headline(
+        "english", escape_html(Course.code + " " + Course.name), ts_query, "StartSel=<b>, StopSel=</b>"
+    )
+    
+    query = db.query(Course, rank.label("rank"), headline.label("headline")).filter(
+        search_vector.op("@@")(ts_query)
+    )
+    if dept_id:
+        query = query.filter(Course.department_id == dept_id)
+    if semester:
+        query = query.filter(Course.semester == semester)
+    
+    rows = query.order_by(rank.desc(), Course.id).limit(limit).all()
+    return [(course, float(score), text) for course, score, text in rows]
+
+
+def _search_courses_fallback(
+    db: Session, terms: list[str], dept_id: int | None, semester: str | None, limit: int
+) -> list[tuple[Course, float, str]]:
+    """Substring search for databases without tsvector support (e.g. SQLite in development)."""
+    query = db.query(Course, Department.name).join(Department)
+    for term in terms:
+        query = query.filter(substring_filter(term, Course.code, Course.name, Department.name))
+    if dept_id:
+        query = query.filter(Course.department_id == dept_id)
+    if semester:
+        query = query.filter(Course.semester == semester)
+    
+    # Weight matches like the tsvector: code (A) > name (B) > department (C)
+    results = []
+    for course, dept_name in query.all():
+        score = sum(
+            3 * (term in course.code.lower()) + 2 * (term in course.name.lower()) + (term in dept_name.lower())
+            for term in terms
+        )
+        results.append((course, float(score), highlight(f"{course.code} {course.name}", terms)))
+    results.sort(key=lambda result: (-result[1], result[0].id))
+    return results[:limit]
 
 
 def get_course_by_id(db: Session, course_id: int) -> Course | None:
@@ -84,12 +161,27 @@ def get_course_by_code(db: Session, code: str) -> Course | None:
     return db.query(Course).filter(Course.code == code).first()
 
 
+def _bump_courses_version(db: Session) -> int:
+    """
+    Bump the "courses" version ahead of a course write and return it.
+    
+    Brings this worker's autocomplete index up to the preceding version
+    first, under the version row lock, so the write can then be applied in
+    place without skipping another worker's.
+    """
+    version = bump_version(db, COURSES_VERSION_NAME)
+    course_index.sync(db, version - 1)
+    return version
+
+
 def create_course(db: Session, course: CourseCreate) -> Course:
     """Create a new course."""
+    version = _bump_courses_version(db)
     db_course = Course(**course.model_dump())
     db.add(db_course)
     db.commit()
     db.refresh(db_course)
+    course_index.add(db_course, version)
     return db_course
 
 
@@ -99,13 +191,17 @@ def update_course(db: Session, course_id: int, course_update: CourseUpdate) -> C
     if not db_course:
         return None
     
+    version = _bump_courses_version(db)
     # Only update fields that are provided (not None)
     update_data = course_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_course, field, value)
+    if "max_students" in update_data:
+        record_seat_change(db, db_course.id, db_course.enrolled_count, db_course.max_students)
     
     db.commit()
     db.refresh(db_course)
+    course_index.add(db_course, version)
     return db_course
 
 
@@ -115,7 +211,28 @@ def delete_course(db: Session, course_id: int) -> bool:
     if not db_course:
         return False
     
+    version = _bump_courses_version(db)
     db.delete(db_course)
     db.commit()
+    course_index.remove(course_id, version)
+    availability_cache.delete(course_id)
     return True
 
+
+def load_autocomplete_index(db: Session) -> int:
+    """Build the in-memory autocomplete index from all courses. Returns the number indexed."""
+    course_index.load(db)
+    return len(course_index)
+
+
+def autocomplete_courses(db: Session, q: str, limit: int = 10) -> list[Suggestion]:
+    """
+    Suggest courses whose code or name words start with the typed text.
+    
+    Served from the in-memory index; the database is only asked, at most
+    once per AUTOCOMPLETE_INDEX_CHECK_SECONDS, whether another worker
+    changed a course since the index was loaded.
+    """
+    course_index.ensure_fresh(db)
+    return course_index.lookup(q, limit)
+
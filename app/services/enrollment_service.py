@@ -9,21 +9,104 @@ Implements critical business rules:
 """
 from datetime import datetime
 
+from fastapi import HTTPException
+from sqlalchemy import func, tuple_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.broadcast import availability_cache, record_seat_change
+from app.models.course import Course
 from app.models.enrollment import Enrollment
 from app.models.student import Student
-from app.schemas.enrollment import EnrollmentCreate
+from app.models.waitlist import WaitlistEntry
+from app.schemas.enrollment import EnrollmentCreate, EnrollmentResponse
 from app.services import student_service, course_service, prerequisite_service
 from app.exceptions import bad_request, conflict
 
 
 def get_enrolled_count(db: Session, course_id: int) -> int:
     """Get count of active enrollments for a course."""
-    return db.query(Enrollment).filter(
+    # A bare COUNT(*) (rather than Query.count()'s subquery) lets the planner
+    # answer from the partial ix_enrollments_course_enrolled index alone
+    return db.query(func.count()).select_from(Enrollment).filter(
         Enrollment.course_id == course_id,
         Enrollment.status == "enrolled"
-    ).count()
+    ).scalar()
+
+
+def adjust_enrolled_count(db: Session, course_id: int, delta: int) -> None:
+    """
+    Add delta to a course's stored enrolled_count.
+    
+    The increment happens in SQL, so concurrent transactions never overwrite
+    each other's changes. Call before committing the enrollment change itself.
+    """
+    counts = db.execute(
+        update(Course)
+        .where(Course.id == course_id)
+        .values(enrolled_count=Course.enrolled_count + delta)
+        .returning(Course.enrolled_count, Course.max_students)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if counts is not None:
+        record_seat_change(db, course_id, *counts)
+
+
+def reserve_seat(db: Session, course_id: int) -> bool:
+    """
+    Claim a seat in a course if one is free.
+    
+    A single conditional UPDATE ... RETURNING checks capacity and increments
+    enrolled_count atomically, so concurrent enrollments can never oversell.
+    Returns False if the course is full (or does not exist).
+    """
+    claimed = db.execute(
+        update(Course)
+        .where(Course.id == course_id, Course.enrolled_count < Course.max_students)
+        .values(enrolled_count=Course.enrolled_count + 1)
+        .returning(Course.enrolled_count, Course.max_students)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if claimed is None:
+        return False
+    record_seat_change(db, course_id, *claimed)
+    return True
+
+
+def reconcile_enrolled_counts(db: Session, repair: bool = True) -> list[dict]:
+    """
+    Find courses whose stored enrolled_count differs from their active enrollments.
+    
+    With repair, each drifted course row is locked and its count recomputed
+    and stored, so enrollments committed in the meantime are not lost.
+    
+    Returns:
+        list: one dict per drifted course with the stored and actual counts
+    """
+    actual = db.query(
+        Enrollment.course_id, func.count().label("actual_count")
+    ).filter(Enrollment.status == "enrolled").group_by(Enrollment.course_id).subquery()
+    actual_count = func.coalesce(actual.c.actual_count, 0)
+    
+    rows = db.query(Course.id, Course.code, Course.enrolled_count, actual_count).outerjoin(
+        actual, actual.c.course_id == Course.id
+    ).filter(Course.enrolled_count != actual_count).order_by(Course.id).all()
+    
+    drift = [
+        {"course_id": course_id, "course_code": code, "stored_count": stored, "actual_count": count}
+        for course_id, code, stored, count in rows
+    ]
+    if not repair or not drift:
+        return drift
+    
+    for item in drift:
+        course = db.query(Course).filter(Course.id == item["course_id"]).with_for_update().first()
+        if course:
+            course.enrolled_count = get_enrolled_count(db, course.id)
+            item["actual_count"] = course.enrolled_count
+            record_seat_change(db, course.id, course.enrolled_count, course.max_students)
+    db.commit()
+    return drift
 
 
 def get_enrollment_by_student_and_course(
@@ -41,6 +124,19 @@ def get_enrollment_by_id(db: Session, enrollment_id: int) -> Enrollment | None:
     return db.query(Enrollment).filter(Enrollment.id == enrollment_id).first()
 
 
+def leave_waitlists(db: Session, pairs: list[tuple[int, int]]) -> None:
+    """
+    Delete the waitlist entries of (student_id, course_id) pairs that were
+    just enrolled directly, so a later promotion does not try again.
+    
+    Runs in the caller's transaction and does not commit.
+    """
+    if pairs:
+        db.query(WaitlistEntry).filter(
+            tuple_(WaitlistEntry.student_id, WaitlistEntry.course_id).in_(pairs)
+        ).delete(synchronize_session=False)
+
+
 def create_enrollment(db: Session, enrollment: EnrollmentCreate) -> Enrollment:
     """
     Create or reactivate an enrollment.
@@ -62,6 +158,11 @@ def create_enrollment(db: Session, enrollment: EnrollmentCreate) -> Enrollment:
     if not course:
         raise bad_request(f"Course with id {enrollment.course_id} does not exist")
     
+    # Fail fast once a course has filled up; reserve_seat below makes the
+    # authoritative check, this just spares the remaining queries
+    if course.enrolled_count >= course.max_students:
+        raise conflict(f"Course is full ({course.max_students} seats)")
+    
     # Check prerequisites
     all_met, missing_prereqs = prerequisite_service.check_prerequisites_met(
         db, enrollment.student_id, enrollment.course_id
@@ -76,36 +177,203 @@ def create_enrollment(db: Session, enrollment: EnrollmentCreate) -> Enrollment:
     existing = get_enrollment_by_student_and_course(
         db, enrollment.student_id, enrollment.course_id
     )
+    if existing and existing.status == "enrolled":
+        # Already actively enrolled
+        raise conflict("Student is already enrolled in this course")
+    
+    # Check seat availability and claim the seat in one statement. The course
+    # row stays locked until commit, so claim it last to keep the lock short.
+    if not reserve_seat(db, enrollment.course_id):
+        db.rollback()
+        raise conflict(f"Course is full ({course.max_students} seats)")
     
     if existing:
-        if existing.status == "enrolled":
-            # Already actively enrolled
+        # Previously dropped - reactivate, unless a concurrent request just did
+        reactivated = db.query(Enrollment).filter(
+            Enrollment.id == existing.id,
+            Enrollment.status == "dropped"
+        ).update(
+            {Enrollment.status: "enrolled", Enrollment.enrolled_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+        if not reactivated:
+            db.rollback()
             raise conflict("Student is already enrolled in this course")
-        else:
+        db_enrollment = existing
+    else:
+        # Create new enrollment
+        db_enrollment = Enrollment(**enrollment.model_dump())
+        db.add(db_enrollment)
+    leave_waitlists(db, [(enrollment.student_id, enrollment.course_id)])
+    
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request created the same student-course row first;
+        # the rollback also releases the seat claimed above
+        db.rollback()
+        raise conflict("Student is already enrolled in this course")
+    db.refresh(db_enrollment)
+    return db_enrollment
+
+
+def create_enrollments(
+    db: Session,
+    enrollments: list[EnrollmentCreate],
+    all_or_nothing: bool = False,
+    _retry: bool = True
+) -> list[EnrollmentResponse | HTTPException | None]:
+    """
+    Create or reactivate many enrollments in one transaction.
+    
+    Applies the same rules as create_enrollment, in request order, but loads
+    the students, courses, prerequisite graph and existing enrollments once
+    for the whole batch and commits once. The affected course rows are locked
+    (in id order) for the duration, so seats are handed out in request order.
+    
+    With all_or_nothing, nothing is committed if any request fails; the
+    requests that would have succeeded are returned as None.
+    
+    Returns:
+        list: per request, the new enrollment, the HTTPException it failed
+        with, or None if it was valid but rolled back
+    """
+    student_ids = {enrollment.student_id for enrollment in enrollments}
+    course_ids = {enrollment.course_id for enrollment in enrollments}
+    
+    courses = {
+        course.id: course for course in db.query(Course).filter(
+            Course.id.in_(course_ids)
+        ).order_by(Course.id).with_for_update()
+    }
+    existing_student_ids = {
+        student_id for (student_id,) in db.query(Student.id).filter(Student.id.in_(student_ids))
+    }
+    existing_rows = {
+        (row.student_id, row.course_id): row for row in db.query(Enrollment).filter(
+            Enrollment.student_id.in_(student_ids),
+            Enrollment.course_id.in_(course_ids)
+        )
+    }
+    
+    # Prerequisites: walk the whole graph in memory, then look up every
+    # student's active enrollments in any required course at once
+    required = prerequisite_service.get_prerequisite_closure(db, course_ids & courses.keys())
+    required_ids = set().union(*required.values())
+    codes = dict(db.query(Course.id, Course.code).filter(Course.id.in_(required_ids))) if required_ids else {}
+    completed: dict[int, set[int]] = {}
+    if required_ids:
+        for student_id, prereq_id in db.query(Enrollment.student_id, Enrollment.course_id).filter(
+            Enrollment.student_id.in_(student_ids),
+            Enrollment.status == "enrolled",
+            Enrollment.course_id.in_(required_ids)
+        ):
+            completed.setdefault(student_id, set()).add(prereq_id)
+    
+    results: list = []
+    accepted: list[tuple[int, Enrollment]] = []
+    enrolled_counts = {course_id: course.enrolled_count for course_id, course in courses.items()}
+    for enrollment in enrollments:
+        student_id, course_id = enrollment.student_id, enrollment.course_id
+        course = courses.get(course_id)
+        if student_id not in existing_student_ids:
+            results.append(bad_request(f"Student with id {student_id} does not exist"))
+            continue
+        if not course:
+            results.append(bad_request(f"Course with id {course_id} does not exist"))
+            continue
+        if enrolled_counts[course_id] >= course.max_students:
+            results.append(conflict(f"Course is full ({course.max_students} seats)"))
+            continue
+        
+        missing = [codes[prereq_id] for prereq_id in required[course_id] if prereq_id not in completed.get(student_id, set())]
+        if missing:
+            results.append(bad_request(f"Prerequisites not met. Missing prerequisites: {', '.join(missing)}"))
+            continue
+        
+        existing = existing_rows.get((student_id, course_id))
+        if existing and existing.status == "enrolled":
+            results.append(conflict("Student is already enrolled in this course"))
+            continue
+        
+        if existing:
             # Previously dropped - reactivate
-            # First check seat availability
-            enrolled_count = get_enrolled_count(db, enrollment.course_id)
-            if enrolled_count >= course.max_students:
-                raise conflict(f"Course is full ({course.max_students} seats)")
-            
-            # Reactivate the enrollment
             existing.status = "enrolled"
             existing.enrolled_at = datetime.utcnow()
-            db.commit()
-            db.refresh(existing)
-            return existing
+            db_enrollment = existing
+        else:
+            db_enrollment = Enrollment(student_id=student_id, course_id=course_id, status="enrolled")
+            db.add(db_enrollment)
+            # A repeat of the same pair later in the batch is a duplicate
+            existing_rows[(student_id, course_id)] = db_enrollment
+        enrolled_counts[course_id] += 1
+        # Later items see this enrollment as met, as a later POST would
+        completed.setdefault(student_id, set()).add(course_id)
+        accepted.append((len(results), db_enrollment))
+        results.append(None)
     
-    # New enrollment - check seat availability
-    enrolled_count = get_enrolled_count(db, enrollment.course_id)
-    if enrolled_count >= course.max_students:
-        raise conflict(f"Course is full ({course.max_students} seats)")
+    if not accepted or (all_or_nothing and len(accepted) < len(enrollments)):
+        db.rollback()
+        return results
     
-    # Create new enrollment
-    db_enrollment = Enrollment(**enrollment.model_dump())
-    db.add(db_enrollment)
+    leave_waitlists(db, [(db_enrollment.student_id, db_enrollment.course_id) for _, db_enrollment in accepted])
+    for course_id, course in courses.items():
+        if enrolled_counts[course_id] != course.enrolled_count:
+            course.enrolled_count = enrolled_counts[course_id]
+            record_seat_change(db, course_id, course.enrolled_count, course.max_students)
+    try:
+        db.flush()
+    except IntegrityError:
+        # A request outside the batch created one of these rows concurrently.
+        # Retrying once sees that row and reports the pair as already enrolled.
+        db.rollback()
+        if _retry:
+            return create_enrollments(db, enrollments, all_or_nothing, _retry=False)
+        if all_or_nothing:
+            return [conflict("Enrollments changed concurrently; retry the request") for _ in enrollments]
+        return [_create_enrollment_result(db, enrollment) for enrollment in enrollments]
+    
+    for index, db_enrollment in accepted:
+        results[index] = EnrollmentResponse.model_validate(db_enrollment)
     db.commit()
-    db.refresh(db_enrollment)
-    return db_enrollment
+    return results
+
+
+def bulk_enroll(db: Session, items: list[EnrollmentCreate], all_or_nothing: bool = False) -> dict:
+    """
+    Enroll many (student, course) pairs and report the outcome of each.
+    
+    Returns:
+        dict: whether anything was committed, counts, and per-item results
+    """
+    outcomes = create_enrollments(db, items, all_or_nothing=all_or_nothing)
+    results = []
+    for index, (item, outcome) in enumerate(zip(items, outcomes)):
+        result = {"index": index, "student_id": item.student_id, "course_id": item.course_id}
+        if isinstance(outcome, HTTPException):
+            result.update(status="failed", status_code=outcome.status_code, detail=outcome.detail)
+        elif outcome is None:
+            result.update(status="skipped", status_code=200, detail="Not committed: another item failed")
+        else:
+            result.update(status="enrolled", status_code=201, enrollment=outcome)
+        results.append(result)
+    
+    enrolled = sum(1 for result in results if result["status"] == "enrolled")
+    return {
+        "committed": enrolled > 0,
+        "enrolled": enrolled,
+        "failed": sum(1 for result in results if result["status"] == "failed"),
+        "results": results,
+    }
+
+
+def _create_enrollment_result(db: Session, enrollment: EnrollmentCreate) -> EnrollmentResponse | HTTPException:
+    """Run create_enrollment, returning its HTTPException instead of raising it."""
+    try:
+        return EnrollmentResponse.model_validate(create_enrollment(db, enrollment))
+    except HTTPException as exc:
+        db.rollback()
+        return exc
 
 
 def drop_enrollment(db: Session, enrollment_id: int) -> Enrollment | None:
@@ -121,12 +389,154 @@ def drop_enrollment(db: Session, enrollment_id: int) -> Enrollment | None:
         # Already dropped, just return it
         return enrollment
     
-    enrollment.status = "dropped"
-    db.commit()
+    # Release the seat first: enroll and swap also lock the course row before
+    # the enrollment row, and a consistent lock order cannot deadlock
+    adjust_enrolled_count(db, enrollment.course_id, -1)
+    
+    # Conditional update so two concurrent drops release the seat only once
+    dropped = db.query(Enrollment).filter(
+        Enrollment.id == enrollment_id,
+        Enrollment.status == "enrolled"
+    ).update({Enrollment.status: "dropped"}, synchronize_session=False)
+    if dropped:
+        # Hand the freed seat to the head of the waitlist in the same transaction
+        promote_from_waitlist(db, enrollment.course_id)
+        db.commit()
+    else:
+        # A concurrent request dropped it first and released the seat already
+        db.rollback()
     db.refresh(enrollment)
     return enrollment
 
 
+def promote_from_waitlist(db: Session, course_id: int) -> list[Enrollment]:
+    """
+    Enroll waitlisted students into a course's free seats, lowest position first.
+    
+    Runs in the caller's transaction and does not commit. Entries whose
+    student can no longer be enrolled (prerequisites dropped since joining,
+    or already enrolled) are removed without taking a seat.
+    """
+    promoted = []
+    while True:
+        entry = db.query(WaitlistEntry).filter(
+            WaitlistEntry.course_id == course_id
+        ).order_by(WaitlistEntry.position).with_for_update().first()
+        if entry is None:
+            break
+        
+        all_met, _ = prerequisite_service.check_prerequisites_met(db, entry.student_id, course_id)
+        existing = get_enrollment_by_student_and_course(db, entry.student_id, course_id)
+        if not all_met or (existing and existing.status == "enrolled"):
+            db.delete(entry)
+            db.flush()
+            continue
+        
+        if not reserve_seat(db, course_id):
+            break
+        if existing:
+            existing.status = "enrolled"
+            existing.enrolled_at = datetime.utcnow()
+            promoted.append(existing)
+        else:
+            enrollment = Enrollment(student_id=entry.student_id, course_id=course_id, status="enrolled")
+            db.add(enrollment)
+            promoted.append(enrollment)
+        db.delete(entry)
+        db.flush()
+    return promoted
+
+
+def fill_from_waitlist(db: Session, course_id: int) -> list[Enrollment]:
+    """Promote waitlisted students into any free seats of a course (e.g. after its capacity grew) and commit."""
+    promoted = promote_from_waitlist(db, course_id)
+    db.commit()
+    return promoted
+
+
+def swap_enrollment(db: Session, enrollment_id: int, course_id: int) -> Enrollment | None:
+    """
+    Drop an active enrollment and enroll the same student in another course, atomically.
+    
+    The new enrollment follows the create_enrollment rules, except that the
+    course being dropped does not count towards its prerequisites. If any
+    rule fails, nothing changes and the student keeps the old seat.
+    Returns the new enrollment, or None if the enrollment does not exist.
+    """
+    enrollment = get_enrollment_by_id(db, enrollment_id)
+    if not enrollment:
+        return None
+    if enrollment.status != "enrolled":
+        raise bad_request("Only an active enrollment can be swapped")
+    if enrollment.course_id == course_id:
+        raise bad_request("Cannot swap an enrollment into the same course")
+    
+    old_course_id = enrollment.course_id
+    student_id = enrollment.student_id
+    course = course_service.get_course_by_id(db, course_id)
+    if not course:
+        raise bad_request(f"Course with id {course_id} does not exist")
+    if course.enrolled_count >= course.max_students:
+        raise conflict(f"Course is full ({course.max_students} seats)")
+    
+    all_met, missing_prereqs = prerequisite_service.check_prerequisites_met(
+        db, student_id, course_id, dropping_course_id=old_course_id
+    )
+    if not all_met:
+        missing_codes = [p.code for p in missing_prereqs]
+        raise bad_request(
+            f"Prerequisites not met. Missing prerequisites: {', '.join(missing_codes)}"
+        )
+    
+    existing = get_enrollment_by_student_and_course(db, student_id, course_id)
+    if existing and existing.status == "enrolled":
+        raise conflict("Student is already enrolled in this course")
+    
+    # Lock both course rows in id order, so two students swapping in opposite
+    # directions cannot deadlock, then claim the new seat
+    db.query(Course.id).filter(Course.id.in_([old_course_id, course_id])).order_by(Course.id).with_for_update().all()
+    if not reserve_seat(db, course_id):
+        db.rollback()
+        raise conflict(f"Course is full ({course.max_students} seats)")
+    
+    # Drop the old enrollment, unless a concurrent request already did
+    dropped = db.query(Enrollment).filter(
+        Enrollment.id == enrollment_id,
+        Enrollment.status == "enrolled"
+    ).update({Enrollment.status: "dropped"}, synchronize_session=False)
+    if not dropped:
+        db.rollback()
+        raise conflict("Enrollment was dropped by another request")
+    adjust_enrolled_count(db, old_course_id, -1)
+    promote_from_waitlist(db, old_course_id)
+    
+    if existing:
+        # Previously dropped from the new course - reactivate
+        reactivated = db.query(Enrollment).filter(
+            Enrollment.id == existing.id,
+            Enrollment.status == "dropped"
+        ).update(
+            {Enrollment.status: "enrolled", Enrollment.enrolled_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+        if not reactivated:
+            db.rollback()
+            raise conflict("Student is already enrolled in this course")
+        new_enrollment = existing
+    else:
+        new_enrollment = Enrollment(student_id=student_id, course_id=course_id)
+        db.add(new_enrollment)
+    leave_waitlists(db, [(student_id, course_id)])
+    
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise conflict("Student is already enrolled in this course")
+    db.refresh(new_enrollment)
+    return new_enrollment
+
+
 def get_student_enrollments(db: Session, student_id: int) -> list[Enrollment]:
     """Get all enrollments for a student."""
     return db.query(Enrollment).filter(Enrollment.student_id == student_id).all()
@@ -134,25 +544,61 @@ def get_student_enrollments(db: Session, student_id: int) -> list[Enrollment]:
 
 def get_students_in_course(db: Session, course_id: int) -> list[Student]:
     """Get all actively enrolled students in a course."""
-    enrollments = db.query(Enrollment).filter(
+    # One join instead of loading each enrollment's student separately
+    return db.query(Student).join(Enrollment, Enrollment.student_id == Student.id).filter(
         Enrollment.course_id == course_id,
         Enrollment.status == "enrolled"
-    ).all()
-    return [e.student for e in enrollments]
+    ).order_by(Student.id).all()
 
 
 def get_course_availability(db: Session, course_id: int) -> dict | None:
-    """Get course availability information."""
+    """
+    Get course availability information.
+    
+    Served from availability_cache when possible; a miss is a single
+    primary-key read whose result is cached until the course's seats change.
+    """
+    availability = availability_cache.get(course_id)
+    if availability is not None:
+        return availability
+    
     course = course_service.get_course_by_id(db, course_id)
     if not course:
         return None
     
-    enrolled_count = get_enrolled_count(db, course_id)
-    return {
+    availability = {
         "course_id": course.id,
         "course_code": course.code,
         "max_students": course.max_students,
-        "enrolled_count": enrolled_count,
-        "available_seats": course.max_students - enrolled_count
+        "enrolled_count": course.enrolled_count,
+        "available_seats": course.max_students - course.enrolled_count
     }
+    availability_cache.set(course_id, availability)
+    return availability
+
 
+def get_courses_availability(
+    db: Session, course_ids: list[int] | None = None, semester: str | None = None
+) -> list[dict]:
+    """
+    Get availability for several courses in one query (unknown ids are skipped).
+    
+    Selects courses by id, by semester, or by both. Seat counts come from the
+    maintained enrolled_count column, so no aggregate over enrollments is needed.
+    """
+    query = db.query(Course.id, Course.code, Course.max_students, Course.enrolled_count)
+    if course_ids is not None:
+        query = query.filter(Course.id.in_(course_ids))
+    if semester is not None:
+        query = query.filter(Course.semester == semester)
+    rows = query.order_by(Course.id).all()
+    return [
+        {
+            "course_id": course_id,
+            "course_code": code,
+            "max_students": max_students,
+            "enrolled_count": enrolled_count,
+            "available_seats": max_students - enrolled_count
+        }
+        for course_id, code, max_students, enrolled_count in rows
+    ]
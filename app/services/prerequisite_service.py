@@ -1,15 +1,28 @@
 """
 Prerequisite service for managing course prerequisites
 """
-from typing import Optional
+from collections import deque
+from typing import Iterable, Optional
+from sqlalchemy import func, insert
 from sqlalchemy.orm import Session
 
-from app.models.prerequisite import Prerequisite
+from app.config import get_settings
+from app.models.prerequisite import Prerequisite, PrerequisiteClosure
 from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.prerequisite_graph import bump_graph_version, closure_query, find_cycles, prerequisite_graph, reaches_query
 from app.schemas.prerequisite import PrerequisiteCreate
-from app.services import course_service, enrollment_service
+from app.services import course_service
 from app.exceptions import bad_request, conflict
 
+# Get settings
+settings = get_settings()
+
+
+def _uses_memory_graph() -> bool:
+    """True if traversals use the in-memory graph, False for recursive CTE queries."""
+    return settings.prerequisite_graph_backend == "memory"
+
 
 def get_prerequisite_by_id(db: Session, prerequisite_id: int) -> Optional[Prerequisite]:
     """Get a prerequisite by ID."""
@@ -26,61 +39,139 @@ def get_prerequisite_by_course_and_prerequisite(
     ).first()
 
 
+def get_prerequisite_relations(db: Session, course_id: int) -> list[Prerequisite]:
+    """Get the prerequisite relationships of a course (with both courses loaded)."""
+    return db.query(Prerequisite).filter(Prerequisite.course_id == course_id).all()
+
+
+def get_direct_prerequisite_ids(db: Session, course_id: int) -> list[int]:
+    """Get the ids of a course's direct prerequisites, in the order they were added."""
+    if _uses_memory_graph():
+        prerequisite_graph.ensure_fresh(db)
+        return prerequisite_graph.direct_prerequisites(course_id)
+    return [
+        prereq_id for (prereq_id,) in db.query(Prerequisite.prerequisite_id).filter(
+            Prerequisite.course_id == course_id
+        ).order_by(Prerequisite.id)
+    ]
+
+
+def get_prerequisite_closure(db: Session, course_ids: Iterable[int]) -> dict[int, list[int]]:
+    """
+    Map each course to the ids of all its direct and indirect prerequisites.
+    
+    With the in-memory graph they come in depth-first order. The sql
+    backend runs one recursive query for every course and the closure
+    backend reads the closure table; both order them by depth.
+    """
+    course_ids = list(course_ids)
+    if _uses_memory_graph():
+        prerequisite_graph.ensure_fresh(db)
+        return {course_id: prerequisite_graph.all_prerequisites(course_id) for course_id in course_ids}
+    
+    closure: dict[int, list[int]] = {course_id: [] for course_id in course_ids}
+    if not course_ids:
+        return closure
+    if settings.prerequisite_graph_backend == "closure":
+        rows = db.query(
+            PrerequisiteClosure.descendant_id, PrerequisiteClosure.ancestor_id, PrerequisiteClosure.depth
+        ).filter(
+            PrerequisiteClosure.descendant_id.in_(course_ids)
+        ).order_by(PrerequisiteClosure.descendant_id, PrerequisiteClosure.depth, PrerequisiteClosure.ancestor_id)
+    else:
+        rows = db.execute(closure_query(course_ids))
+    for root_id, prereq_id, depth in rows:
+        closure[root_id].append(prereq_id)
+    return closure
+
+
 def get_direct_prerequisites(db: Session, course_id: int) -> list[Course]:
     """Get direct prerequisites for a course."""
-    prerequisites = db.query(Prerequisite).filter(
-        Prerequisite.course_id == course_id
-    ).all()
-    return [p.prerequisite for p in prerequisites]
+    return _load_courses(db, get_direct_prerequisite_ids(db, course_id))
 
 
 def get_all_prerequisites(db: Session, course_id: int) -> list[Course]:
     """
     Get all prerequisites recursively (direct and indirect).
     
-    Uses depth-first search to traverse the prerequisite chain.
+    The chain is traversed in the in-memory graph or by one recursive
+    query; the courses found are then loaded with a single query.
     """
-    visited = set()
-    result = []
-    
-    def dfs(course_id: int):
-        if course_id in visited:
-            return
-        visited.add(course_id)
-        
-        direct_prereqs = get_direct_prerequisites(db, course_id)
-        for prereq in direct_prereqs:
-            if prereq.id not in visited:
-                result.append(prereq)
-                dfs(prereq.id)
-    
-    dfs(course_id)
-    return result
+    return _load_courses(db, get_prerequisite_closure(db, [course_id])[course_id])
+
+
+def _load_courses(db: Session, course_ids: list[int]) -> list[Course]:
+    """Load courses by id in one query, keeping the order of course_ids."""
+    if not course_ids:
+        return []
+    courses = {course.id: course for course in db.query(Course).filter(Course.id.in_(course_ids))}
+    return [courses[course_id] for course_id in course_ids if course_id in courses]
 
 
 def has_circular_dependency(db: Session, course_id: int, prerequisite_id: int) -> bool:
     """
     Check if adding a prerequisite would create a circular dependency.
     
-    Uses DFS to check if prerequisite_id is reachable from course_id
-    through the prerequisite chain.
-    """
-    visited = set()
-    
-    def dfs(current_id: int) -> bool:
-        if current_id == course_id:
-            return True  # Circular dependency found
-        if current_id in visited:
-            return False
-        visited.add(current_id)
-        
-        direct_prereqs = get_direct_prerequisites(db, current_id)
-        for prereq in direct_prereqs:
-            if dfs(prereq.id):
-                return True
-        return False
+    It would if course_id is reachable from prerequisite_id through the
+    prerequisite chain. In memory mode this is checked against the graph,
+    which the caller must have brought up to date; otherwise it is one
+    recursive query, or a primary-key lookup in the closure table.
+    """
+    if course_id == prerequisite_id:
+        return True
+    if _uses_memory_graph():
+        return prerequisite_graph.reaches(prerequisite_id, course_id)
+    if settings.prerequisite_graph_backend == "closure":
+        return db.query(
+            db.query(PrerequisiteClosure).filter(
+                PrerequisiteClosure.ancestor_id == course_id,
+                PrerequisiteClosure.descendant_id == prerequisite_id
+            ).exists()
+        ).scalar()
+    return db.execute(reaches_query(prerequisite_id, course_id)).scalar()
+
+
+def load_prerequisite_graph(db: Session) -> int | None:
+    """Load the in-memory prerequisite graph (memory mode only). Returns the graph version."""
+    if not _uses_memory_graph():
+        return None
+    prerequisite_graph.load(db)
+    return prerequisite_graph.version
+
+
+def refresh_closure(db: Session, course_ids: Iterable[int]) -> None:
+    """
+    Recompute the closure rows affected by changes to the given courses' direct prerequisites.
     
-    return dfs(prerequisite_id)
+    Only those courses and the courses that require them can gain or lose
+    prerequisites, so just their rows are replaced, from one recursive
+    query. Call after the edge changes are flushed, in the same transaction.
+    """
+    course_ids = set(course_ids)
+    affected = course_ids | {
+        descendant_id for (descendant_id,) in db.query(PrerequisiteClosure.descendant_id).filter(
+            PrerequisiteClosure.ancestor_id.in_(course_ids)
+        )
+    }
+    db.query(PrerequisiteClosure).filter(
+        PrerequisiteClosure.descendant_id.in_(affected)
+    ).delete(synchronize_session=False)
+    db.execute(insert(PrerequisiteClosure).from_select(
+        ["descendant_id", "ancestor_id", "depth"], closure_query(affected)
+    ))
+
+
+def rebuild_closure(db: Session) -> int:
+    """Regenerate course_prerequisite_closure from course_prerequisites. Returns the number of rows."""
+    # Taking the version row lock keeps prerequisite writes out during the rebuild
+    bump_graph_version(db)
+    db.query(PrerequisiteClosure).delete(synchronize_session=False)
+    db.execute(insert(PrerequisiteClosure).from_select(
+        ["descendant_id", "ancestor_id", "depth"], closure_query()
+    ))
+    rows = db.query(func.count()).select_from(PrerequisiteClosure).scalar()
+    db.commit()
+    return rows
 
 
 def add_prerequisite(db: Session, prerequisite: PrerequisiteCreate) -> Prerequisite:
@@ -106,6 +197,12 @@ def add_prerequisite(db: Session, prerequisite: PrerequisiteCreate) -> Prerequis
     if prerequisite.course_id == prerequisite.prerequisite_id:
         raise bad_request("A course cannot be a prerequisite of itself")
     
+    # Lock the graph version, serializing prerequisite writes, and bring the
+    # in-memory graph up to date before checking against it
+    version = bump_graph_version(db)
+    if _uses_memory_graph():
+        prerequisite_graph.sync(db, version - 1)
+    
     # Check for duplicate
     existing = get_prerequisite_by_course_and_prerequisite(
         db, prerequisite.course_id, prerequisite.prerequisite_id
@@ -125,7 +222,11 @@ def add_prerequisite(db: Session, prerequisite: PrerequisiteCreate) -> Prerequis
     # Create prerequisite
     db_prerequisite = Prerequisite(**prerequisite.model_dump())
     db.add(db_prerequisite)
+    db.flush()
+    refresh_closure(db, [prerequisite.course_id])
     db.commit()
+    if _uses_memory_graph():
+        prerequisite_graph.add(prerequisite.course_id, prerequisite.prerequisite_id, version)
     db.refresh(db_prerequisite)
     return db_prerequisite
 
@@ -136,56 +237,212 @@ def remove_prerequisite(db: Session, course_id: int, prerequisite_id: int) -> bo
     if not prerequisite:
         return False
     
+    version = bump_graph_version(db)
+    if _uses_memory_graph():
+        prerequisite_graph.sync(db, version - 1)
     db.delete(prerequisite)
+    db.flush()
+    refresh_closure(db, [course_id])
     db.commit()
+    if _uses_memory_graph():
+        prerequisite_graph.remove(course_id, prerequisite_id, version)
     return True
 
 
-def get_prerequisite_chain(db: Session, course_id: int) -> dict:
+def bulk_add_prerequisites(db: Session, edges: list[PrerequisiteCreate], dry_run: bool = False) -> dict:
+    """
+    Add many prerequisite relationships in one transaction.
+    
+    The batch is validated as a whole: all courses must exist (one query),
+    edges that already exist or repeat are skipped, and the existing graph
+    plus the new edges must stay acyclic. That is checked with a single
+    topological sort, and every cycle found is reported in one error. The
+    edges are then inserted, the closure table refreshed once and the
+    transaction committed (or, with dry_run, rolled back).
+    
+    Returns {"created", "skipped", "committed"}.
+    """
+    pairs = list(dict.fromkeys((edge.course_id, edge.prerequisite_id) for edge in edges))
+    course_ids = {course_id for pair in pairs for course_id in pair}
+    existing_ids = {course_id for (course_id,) in db.query(Course.id).filter(Course.id.in_(course_ids))}
+    missing_ids = sorted(course_ids - existing_ids)
+    if missing_ids:
+        raise bad_request(f"Courses do not exist: {', '.join(str(course_id) for course_id in missing_ids)}")
+    
+    # Lock the graph version for the whole import, as add_prerequisite does
+    version = bump_graph_version(db)
+    if _uses_memory_graph():
+        prerequisite_graph.sync(db, version - 1)
+    
+    existing = {
+        (course_id, prereq_id)
+        for course_id, prereq_id in db.query(Prerequisite.course_id, Prerequisite.prerequisite_id)
+    }
+    new_pairs = [pair for pair in pairs if pair not in existing]
+    
+    cycles = find_cycles([*existing, *new_pairs])
+    if cycles:
+        codes = dict(db.query(Course.id, Course.code).filter(Course.id.in_({node for cycle in cycles for node in cycle})))
+        raise bad_request(
+            f"Adding these prerequisites would create {len(cycles)} circular dependenc"
+            f"{'y' if len(cycles) == 1 else 'ies'} (each course requires the next): "
+            + "; ".join(" -> ".join(codes[node] for node in cycle) for cycle in cycles)
+        )
+    
+    if new_pairs:
+        db.execute(insert(Prerequisite), [
+            {"course_id": course_id, "prerequisite_id": prereq_id} for course_id, prereq_id in new_pairs
+        ])
+        refresh_closure(db, {course_id for course_id, prereq_id in new_pairs})
+    
+    if dry_run:
+        db.rollback()
+    else:
+        db.commit()
+        if _uses_memory_graph():
+            for course_id, prereq_id in new_pairs:
+                prerequisite_graph.add(course_id, prereq_id, version)
+    return {"created": len(new_pairs), "skipped": len(edges) - len(new_pairs), "committed": not dry_run}
+
+
+def _load_chain(db: Session, course_id: int) -> tuple[dict[int, Course], dict[int, list[int]]] | None:
+    """
+    Load a course's prerequisite chain: every course in it (one query) and
+    each one's direct prerequisite ids (from the graph, or one more query).
+    
+    Returns None if the course does not exist.
+    """
+    chain_ids = [course_id, *get_prerequisite_closure(db, [course_id])[course_id]]
+    courses = {course.id: course for course in _load_courses(db, chain_ids)}
+    if course_id not in courses:
+        return None
+    
+    if _uses_memory_graph():
+        direct = {chain_id: prerequisite_graph.direct_prerequisites(chain_id) for chain_id in chain_ids}
+    else:
+        direct = {chain_id: [] for chain_id in chain_ids}
+        for parent_id, prereq_id in db.query(Prerequisite.course_id, Prerequisite.prerequisite_id).filter(
+            Prerequisite.course_id.in_(chain_ids)
+        ).order_by(Prerequisite.id):
+            direct[parent_id].append(prereq_id)
+    
+    # Drop edges to courses that vanished between the two reads
+    return courses, {
+        chain_id: [prereq_id for prereq_id in prereq_ids if prereq_id in courses]
+        for chain_id, prereq_ids in direct.items()
+    }
+
+
+def get_prerequisite_chain(db: Session, course_id: int, max_depth: int | None = None) -> dict:
     """
     Get full prerequisite chain as a nested structure.
     
-    Returns a dictionary with course info and nested prerequisites.
+    Returns a dictionary with course info and nested prerequisites, cut off
+    below max_depth levels (None = unlimited); nodes whose prerequisites were
+    cut off are marked truncated. A prerequisite shared by several courses
+    is built once per remaining depth and reused, though the nested form
+    still repeats it under each parent; use get_prerequisite_graph to list
+    every course once.
     """
-    course = course_service.get_course_by_id(db, course_id)
-    if not course:
+    loaded = _load_chain(db, course_id)
+    if loaded is None:
         return None
+    courses, direct = loaded
+    memo: dict[tuple[int, int | None], dict] = {}
     
-    direct_prereqs = get_direct_prerequisites(db, course_id)
-    chain = {
-        "course_id": course.id,
-        "course_code": course.code,
-        "course_name": course.name,
-        "direct_prerequisites": [
-            get_prerequisite_chain(db, prereq.id) for prereq in direct_prereqs
-        ]
+    def build(current_id: int, remaining: int | None) -> dict:
+        key = (current_id, remaining)
+        if key not in memo:
+            course = courses[current_id]
+            expand = remaining is None or remaining > 0
+            next_remaining = None if remaining is None else remaining - 1
+            memo[key] = {
+                "course_id": course.id,
+                "course_code": course.code,
+                "course_name": course.name,
+                "direct_prerequisites": [
+                    build(prereq_id, next_remaining) for prereq_id in direct[current_id]
+                ] if expand else [],
+                "truncated": not expand and bool(direct[current_id])
+            }
+        return memo[key]
+    
+    return build(course_id, max_depth)
+
+
+def get_prerequisite_graph(db: Session, course_id: int, max_depth: int | None = None) -> dict:
+    """
+    Get a course's prerequisite chain as deduplicated nodes plus an edge list.
+    
+    Each course appears once, with its shortest distance from the requested
+    course, and each prerequisite relationship once. Courses further than
+    max_depth levels away (None = unlimited) are left out and the nodes at
+    the limit that have prerequisites are marked truncated.
+    """
+    loaded = _load_chain(db, course_id)
+    if loaded is None:
+        return None
+    courses, direct = loaded
+    
+    # Breadth-first, so each course is expanded once at its shortest depth
+    depths = {course_id: 0}
+    queue = deque([course_id])
+    edges = []
+    while queue:
+        current_id = queue.popleft()
+        if max_depth is not None and depths[current_id] >= max_depth:
+            continue
+        for prereq_id in direct[current_id]:
+            edges.append({"course_id": current_id, "prerequisite_id": prereq_id})
+            if prereq_id not in depths:
+                depths[prereq_id] = depths[current_id] + 1
+                queue.append(prereq_id)
+    
+    return {
+        "course_id": course_id,
+        "nodes": [
+            {
+                "course_id": node_id,
+                "course_code": courses[node_id].code,
+                "course_name": courses[node_id].name,
+                "depth": depth,
+                "truncated": max_depth is not None and depth >= max_depth and bool(direct[node_id])
+            }
+            for node_id, depth in depths.items()
+        ],
+        "edges": edges
     }
-    return chain
 
 
 def check_prerequisites_met(
-    db: Session, student_id: int, course_id: int
+    db: Session, student_id: int, course_id: int, dropping_course_id: int | None = None
 ) -> tuple[bool, list[Course]]:
     """
     Check if a student has met all prerequisites for a course.
     
+    An enrollment in dropping_course_id (one being dropped in the same
+    transaction, e.g. by a swap) does not count towards the prerequisites.
+    
     Returns:
         tuple: (all_met: bool, missing_prerequisites: list[Course])
     """
-    # Get all prerequisites (direct and indirect)
-    all_prereqs = get_all_prerequisites(db, course_id)
+    # Get all prerequisite ids (direct and indirect)
+    prereq_ids = get_prerequisite_closure(db, [course_id])[course_id]
     
-    if not all_prereqs:
+    if not prereq_ids:
         return True, []  # No prerequisites
     
-    # Get student's enrollments
-    student_enrollments = enrollment_service.get_student_enrollments(db, student_id)
-    
-    # Check which prerequisites are met (student is enrolled)
+    # Only look up the student's active enrollments in the prerequisite courses
     enrolled_course_ids = {
-        e.course_id for e in student_enrollments if e.status == "enrolled"
+        course_id for (course_id,) in db.query(Enrollment.course_id).filter(
+            Enrollment.student_id == student_id,
+            Enrollment.status == "enrolled",
+            Enrollment.course_id.in_(prereq_ids)
+        )
     }
+    enrolled_course_ids.discard(dropping_course_id)
     
-    missing = [prereq for prereq in all_prereqs if prereq.id not in enrolled_course_ids]
+    # Courses are only loaded for the prerequisites that are missing
+    missing = _load_courses(db, [prereq_id for prereq_id in prereq_ids if prereq_id not in enrolled_course_ids])
     
     return len(missing) == 0, missing
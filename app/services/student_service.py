@@ -1,11 +1,12 @@
 """
 Student service layer for business logic
 """
-from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from app.models.student import Student
+from app.pagination import apply_sort, count_total, fetch_keyset_page
 from app.schemas.student import StudentCreate
+from app.search import substring_filter
 
 
 def get_all_students(
@@ -15,13 +16,18 @@ def get_all_students(
     dept_id: int | None = None,
     search: str | None = None,
     sort_by: str = "name",
-    sort_order: str = "asc"
-) -> tuple[list[Student], int]:
+    sort_order: str = "asc",
+    cursor: str | None = None,
+    total_mode: str = "exact"
+) -> tuple[list[Student], int, str | None]:
     """
     Get all students with pagination, filtering, sorting, and search.
     
+    Pages by page number, or by keyset when a cursor is given (an empty
+    cursor starts at the first page).
+    
     Returns:
-        tuple: (list of students, total count)
+        tuple: (list of students, total count or None, next cursor or None)
     """
     query = db.query(Student)
     
@@ -30,17 +36,12 @@ def get_all_students(
         query = query.filter(Student.department_id == dept_id)
     
     if search:
-        search_pattern = f"%{search}%"
         query = query.filter(
-            or_(
-                Student.name.ilike(search_pattern),
-                Student.email.ilike(search_pattern),
-                Student.student_number.ilike(search_pattern)
-            )
+            substring_filter(search, Student.name, Student.email, Student.student_number)
         )
     
     # Get total count before pagination
-    total = query.count()
+    total = count_total(query, total_mode, ("students", dept_id, search))
     
     # Apply sorting
     sort_column = None
@@ -53,16 +54,20 @@ def get_all_students(
     else:
         sort_column = Student.name  # Default
     
-    if sort_order == "desc":
-        query = query.order_by(sort_column.desc())
-    else:
-        query = query.order_by(sort_column.asc())
+    # Keyset pagination: seek past the cursor instead of skipping rows
+    if cursor is not None:
+        students, next_cursor = fetch_keyset_page(
+            query, sort_column, Student.id, sort_by, sort_order, cursor, page_size
+        )
+        return students, total, next_cursor
+    
+    query = apply_sort(query, sort_column, Student.id, sort_order)
     
     # Apply pagination
     offset = (page - 1) * page_size
     students = query.offset(offset).limit(page_size).all()
     
-    return students, total
+    return students, total, None
 
 
 def get_student_by_id(db: Session, student_id: int) -> Student | None:
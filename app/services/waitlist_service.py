@@ -0,0 +1,131 @@
+"""
+Waitlist service for full courses
+
+Students join the waitlist of a full course instead of polling for a free
+seat. Seats freed by drops and swaps go to the head of the queue in the same
+transaction (see enrollment_service.promote_from_waitlist).
+"""
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.course import Course
+from app.models.waitlist import WaitlistEntry
+from app.schemas.waitlist import WaitlistCreate
+from app.services import student_service, course_service, enrollment_service, prerequisite_service
+from app.exceptions import bad_request, conflict
+
+
+def get_waitlist_entry_by_id(db: Session, entry_id: int) -> WaitlistEntry | None:
+    """Get a waitlist entry by ID."""
+    return db.query(WaitlistEntry).filter(WaitlistEntry.id == entry_id).first()
+
+
+def _to_dict(entry: WaitlistEntry, place: int) -> dict:
+    return {
+        "id": entry.id,
+        "student_id": entry.student_id,
+        "course_id": entry.course_id,
+        "joined_at": entry.joined_at,
+        "place": place,
+    }
+
+
+def get_place(db: Session, entry: WaitlistEntry) -> int:
+    """Return the entry's place in its course's queue (1 = next to be promoted)."""
+    return db.query(func.count()).select_from(WaitlistEntry).filter(
+        WaitlistEntry.course_id == entry.course_id,
+        WaitlistEntry.position <= entry.position
+    ).scalar()
+
+
+def join_waitlist(db: Session, waitlist: WaitlistCreate) -> dict:
+    """
+    Add a student to the end of a full course's waitlist.
+    
+    Business rules:
+    1. Student and course must exist
+    2. Student must not be enrolled or already waiting
+    3. Student must meet the prerequisites (they are enrolled on promotion)
+    4. The course must be full; otherwise the student should enroll directly
+    """
+    student = student_service.get_student_by_id(db, waitlist.student_id)
+    if not student:
+        raise bad_request(f"Student with id {waitlist.student_id} does not exist")
+    
+    course = course_service.get_course_by_id(db, waitlist.course_id)
+    if not course:
+        raise bad_request(f"Course with id {waitlist.course_id} does not exist")
+    
+    existing = enrollment_service.get_enrollment_by_student_and_course(
+        db, waitlist.student_id, waitlist.course_id
+    )
+    if existing and existing.status == "enrolled":
+        raise conflict("Student is already enrolled in this course")
+    
+    waiting = db.query(WaitlistEntry).filter(
+        WaitlistEntry.student_id == waitlist.student_id,
+        WaitlistEntry.course_id == waitlist.course_id
+    ).first()
+    if waiting:
+        raise conflict("Student is already on the waitlist for this course")
+    
+    all_met, missing_prereqs = prerequisite_service.check_prerequisites_met(
+        db, waitlist.student_id, waitlist.course_id
+    )
+    if not all_met:
+        missing_codes = [p.code for p in missing_prereqs]
+        raise bad_request(
+            f"Prerequisites not met. Missing prerequisites: {', '.join(missing_codes)}"
+        )
+    
+    # Lock the course row: seats cannot free up (and promote nobody) between
+    # the fullness check and the insert, and positions are assigned in order
+    course = db.query(Course).filter(Course.id == waitlist.course_id).with_for_update().populate_existing().one()
+    if course.enrolled_count < course.max_students:
+        db.rollback()
+        raise conflict("Course has open seats; enroll directly instead")
+    
+    last_position = db.query(func.max(WaitlistEntry.position)).filter(
+        WaitlistEntry.course_id == waitlist.course_id
+    ).scalar()
+    entry = WaitlistEntry(
+        student_id=waitlist.student_id,
+        course_id=waitlist.course_id,
+        position=(last_position or 0) + 1
+    )
+    db.add(entry)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise conflict("Student is already on the waitlist for this course")
+    db.refresh(entry)
+    return _to_dict(entry, get_place(db, entry))
+
+
+def leave_waitlist(db: Session, entry_id: int) -> bool:
+    """Remove a waitlist entry. Returns True if removed, False if not found."""
+    entry = get_waitlist_entry_by_id(db, entry_id)
+    if not entry:
+        return False
+    
+    db.delete(entry)
+    db.commit()
+    return True
+
+
+def get_course_waitlist(db: Session, course_id: int) -> list[dict]:
+    """Get a course's waitlist in promotion order."""
+    entries = db.query(WaitlistEntry).filter(
+        WaitlistEntry.course_id == course_id
+    ).order_by(WaitlistEntry.position).all()
+    return [_to_dict(entry, place) for place, entry in enumerate(entries, start=1)]
+
+
+def get_student_waitlist(db: Session, student_id: int) -> list[dict]:
+    """Get every waitlist a student is on, with their place in each."""
+    entries = db.query(WaitlistEntry).filter(
+        WaitlistEntry.student_id == student_id
+    ).order_by(WaitlistEntry.joined_at, WaitlistEntry.id).all()
+    return [_to_dict(entry, get_place(db, entry)) for entry in entries]
@@ -0,0 +1,205 @@
+"""
+Enrollment hot path benchmark
+
+Loads a synthetic enrollments table where most rows are soft-deleted
+("dropped"), then times the seat count (get_enrolled_count) and course roster
+(get_students_in_course) queries on randomly chosen courses and reports
+latency percentiles. With --compare, the hot path indexes are dropped for a
+first run and recreated for a second, showing what they buy.
+
+Run it against a scratch database: it inserts millions of rows and, with
+--compare, drops and recreates indexes.
+
+Usage:
+    DATABASE_URL=postgresql://... python scripts/benchmark_enrollments.py \
+        --rows 10000000 --courses 5000 --students 200000 --active-percent 5 --compare
+    
+    # Re-run the measurements against data loaded earlier
+    DATABASE_URL=postgresql://... python scripts/benchmark_enrollments.py --skip-load
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.autocomplete import COURSES_VERSION_NAME
+from app.cache_versions import bump_version
+from app.database import SessionLocal, engine
+from app.models import Course, Department, Enrollment, Student
+from app.services import enrollment_service
+
+BENCH_DEPT_CODE = "BENCH"
+
+# Indexes from the enrollment hot path migration
+HOT_PATH_INDEXES = [
+    index for index in Enrollment.__table__.indexes
+    if index.name in ("ix_enrollments_course_enrolled", "ix_enrollments_student_enrolled", "ix_enrollments_course_status")
+]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the pct-th percentile of samples (nearest-rank)."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def load_data(db: Session, args: argparse.Namespace) -> None:
+    """Insert a benchmark department, its courses and students, and the enrollment rows."""
+    if args.rows > args.courses * args.students:
+        raise SystemExit("--rows cannot exceed --courses * --students (one row per student-course pair)")
+    
+    dept = Department(code=BENCH_DEPT_CODE, name="Benchmark")
+    db.add(dept)
+    db.flush()
+    
+    db.execute(Course.__table__.insert(), [
+        {"code": f"BEN{i}", "name": f"Benchmark Course {i}", "credits": 3,
+         "department_id": dept.id, "max_students": 100, "semester": "Fall 2024"}
+        for i in range(args.courses)
+    ])
+    db.execute(Student.__table__.insert(), [
+        {"student_number": f"BEN{i}", "name": f"Benchmark Student {i}",
+         "email": f"bench{i}@example.com", "department_id": dept.id}
+        for i in range(args.students)
+    ])
+    bump_version(db, COURSES_VERSION_NAME)
+    db.commit()
+    
+    course_ids = [row.id for row in db.query(Course.id).filter(Course.department_id == dept.id).order_by(Course.id)]
+    student_ids = [row.id for row in db.query(Student.id).filter(Student.department_id == dept.id).order_by(Student.id)]
+    
+    # Row i pairs course i % courses with student i // courses, so pairs never repeat
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    for batch_start in range(0, args.rows, args.batch_size):
+        batch = []
+        for i in range(batch_start, min(batch_start + args.batch_size, args.rows)):
+            active = rng.random() * 100 < args.active_percent
+            batch.append({
+                "course_id": course_ids[i % args.courses],
+                "student_id": student_ids[i // args.courses],
+                "status": "enrolled" if active else "dropped",
+            })
+        db.execute(Enrollment.__table__.insert(), batch)
+        db.commit()
+        print(f"  inserted {batch_start + len(batch):,} / {args.rows:,} enrollments", end="\r")
+    print(f"\n  loaded in {time.perf_counter() - start:.1f}s")
+
+
+def analyze() -> None:
+    """Refresh planner statistics so plans reflect the loaded data."""
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def explain(db: Session, course_id: int) -> None:
+    """Print the PostgreSQL plans for both queries."""
+    for label, query in (
+        ("seat count", enrollment_service.get_enrolled_count),
+        ("roster", enrollment_service.get_students_in_course),
+    ):
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            captured.append((statement, parameters))
+        
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            query(db, course_id)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        
+        statement, parameters = captured[-1]
+        plan = db.connection().exec_driver_sql("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters).all()
+        print(f"\n  {label} plan:")
+        for (line,) in plan:
+            print(f"    {line}")
+
+
+def measure(db: Session, course_ids: list[int], samples: int, label: str) -> None:
+    """Time both queries on random courses and print percentiles."""
+    rng = random.Random(0)
+    chosen = [rng.choice(course_ids) for _ in range(samples)]
+    
+    # Warm the cache so both runs measure steady-state latency
+    for course_id in chosen[:10]:
+        enrollment_service.get_enrolled_count(db, course_id)
+        enrollment_service.get_students_in_course(db, course_id)
+    
+    for name, query in (
+        ("seat count", enrollment_service.get_enrolled_count),
+        ("roster", enrollment_service.get_students_in_course),
+    ):
+        latencies = []
+        for course_id in chosen:
+            start = time.perf_counter()
+            query(db, course_id)
+            latencies.append(time.perf_counter() - start)
+            db.expunge_all()
+        print(
+            f"{label:>16} {name:>11} {statistics.median(latencies) * 1000:>9.2f} "
+            f"{percentile(latencies, 95) * 1000:>9.2f} {percentile(latencies, 99) * 1000:>9.2f}"
+        )
+
+
+def main(args: argparse.Namespace) -> None:
+    """Load data (unless skipped) and run the measurements."""
+    if SessionLocal is None:
+        raise SystemExit("DATABASE_URL is not configured")
+    
+    is_postgresql = engine.dialect.name == "postgresql"
+    db = SessionLocal()
+    try:
+        if not args.skip_load:
+            if db.query(Department).filter(Department.code == BENCH_DEPT_CODE).first():
+                raise SystemExit("Benchmark data already loaded; pass --skip-load to reuse it")
+            print(f"Loading {args.rows:,} enrollments ({args.active_percent}% active)...")
+            load_data(db, args)
+        
+        course_ids = [row.id for row in db.query(Course.id).join(Department).filter(Department.code == BENCH_DEPT_CODE)]
+        if not course_ids:
+            raise SystemExit("No benchmark data found; run without --skip-load first")
+        
+        print(f"\n{'indexes':>16} {'query':>11} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        if args.compare:
+            db.close()
+            for index in HOT_PATH_INDEXES:
+                index.drop(engine, checkfirst=True)
+            analyze()
+            measure(db, course_ids, args.samples, "without")
+            if is_postgresql and args.explain:
+                explain(db, course_ids[0])
+            db.close()
+            for index in HOT_PATH_INDEXES:
+                index.create(engine, checkfirst=True)
+        
+        analyze()
+        measure(db, course_ids, args.samples, "hot path")
+        if is_postgresql and args.explain:
+            explain(db, course_ids[0])
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark seat count and roster queries on a large enrollments table")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Enrollment rows to insert")
+    parser.add_argument("--courses", type=int, default=5000)
+    parser.add_argument("--students", type=int, default=200_000)
+    parser.add_argument("--active-percent", type=float, default=5.0, help="Share of rows left 'enrolled'")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--samples", type=int, default=200, help="Queries timed per measurement")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-load", action="store_true", help="Reuse previously loaded benchmark data")
+    parser.add_argument("--compare", action="store_true", help="Also measure with the hot path indexes dropped")
+    parser.add_argument("--explain", action="store_true", help="Print EXPLAIN ANALYZE plans (PostgreSQL)")
+    main(parser.parse_args())
@@ -0,0 +1,201 @@
+"""
+Prerequisite traversal benchmark
+
+Loads a layered prerequisite graph (by default 2,000 courses in 10 levels,
+each course requiring a few courses of the level below), then times
+get_all_prerequisites and has_circular_dependency on courses from the top
+level with each traversal strategy:
+
+- per-node: the original recursive DFS, one query per visited course
+- memory:   the in-memory graph (PREREQUISITE_GRAPH_BACKEND=memory)
+- sql:      one recursive CTE query (PREREQUISITE_GRAPH_BACKEND=sql)
+- closure:  the materialized closure table (PREREQUISITE_GRAPH_BACKEND=closure)
+
+Run it against a scratch database: it inserts thousands of courses and edges.
+
+Usage:
+    DATABASE_URL=postgresql://... python scripts/benchmark_prerequisites.py \
+        --courses 2000 --levels 10 --fanout 3
+    
+    # Re-run the measurements against data loaded earlier
+    DATABASE_URL=postgresql://... python scripts/benchmark_prerequisites.py --skip-load
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy.orm import Session
+
+from app.autocomplete import COURSES_VERSION_NAME
+from app.cache_versions import bump_version
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import Course, Department, Prerequisite
+from app.services import prerequisite_service
+
+BENCH_DEPT_CODE = "PREBENCH"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the pct-th percentile of samples (nearest-rank)."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def load_data(db: Session, args: argparse.Namespace) -> None:
+    """Insert the benchmark department, its courses and a layered prerequisite graph."""
+    dept = Department(code=BENCH_DEPT_CODE, name="Prerequisite Benchmark")
+    db.add(dept)
+    db.flush()
+    
+    db.execute(Course.__table__.insert(), [
+        {"code": f"PRE{i}", "name": f"Prerequisite Benchmark {i}", "credits": 3,
+         "department_id": dept.id, "max_students": 100, "semester": "Fall 2024"}
+        for i in range(args.courses)
+    ])
+    course_ids = [row.id for row in db.query(Course.id).filter(Course.department_id == dept.id).order_by(Course.id)]
+    
+    # Level 0 is the top of every chain; each course requires `fanout` courses of the next level
+    per_level = len(course_ids) // args.levels
+    levels = [course_ids[i * per_level:(i + 1) * per_level] for i in range(args.levels)]
+    rng = random.Random(args.seed)
+    edges = [
+        {"course_id": course_id, "prerequisite_id": prereq_id}
+        for upper, lower in zip(levels, levels[1:])
+        for course_id in upper
+        for prereq_id in rng.sample(lower, min(args.fanout, len(lower)))
+    ]
+    db.execute(Prerequisite.__table__.insert(), edges)
+    bump_version(db, COURSES_VERSION_NAME)
+    db.commit()
+    
+    # Regenerate the closure table; this also bumps the graph version so
+    # every worker's in-memory graph reloads
+    prerequisite_service.rebuild_closure(db)
+    print(f"  {len(course_ids):,} courses in {args.levels} levels, {len(edges):,} prerequisite edges")
+
+
+def per_node_all_prerequisites(db: Session, course_id: int) -> list[Course]:
+    """The original traversal: recursive DFS issuing one query per visited course."""
+    visited = set()
+    result = []
+
+    def dfs(current_id: int):
+        if current_id in visited:
+            return
+        visited.add(current_id)
+        
+        relations = db.query(Prerequisite).filter(Prerequisite.course_id == current_id).all()
+        for prereq in (relation.prerequisite for relation in relations):
+            if prereq.id not in visited:
+                result.append(prereq)
+                dfs(prereq.id)
+    
+    dfs(course_id)
+    return result
+
+
+def per_node_has_circular_dependency(db: Session, course_id: int, prerequisite_id: int) -> bool:
+    """The original cycle check: DFS from the prerequisite, one query per visited course."""
+    visited = set()
+
+    def dfs(current_id: int) -> bool:
+        if current_id == course_id:
+            return True
+        if current_id in visited:
+            return False
+        visited.add(current_id)
+        
+        relations = db.query(Prerequisite).filter(Prerequisite.course_id == current_id).all()
+        return any(dfs(relation.prerequisite_id) for relation in relations)
+    
+    return dfs(prerequisite_id)
+
+
+def measure(db: Session, label: str, top_ids: list[int], bottom_ids: list[int], samples: int) -> None:
+    """Time both operations for the current strategy and print percentiles."""
+    rng = random.Random(0)
+    pairs = [(rng.choice(top_ids), rng.choice(bottom_ids)) for _ in range(samples)]
+    
+    if label == "per-node":
+        all_prerequisites = per_node_all_prerequisites
+        has_circular_dependency = per_node_has_circular_dependency
+    else:
+        get_settings().prerequisite_graph_backend = label
+        all_prerequisites = prerequisite_service.get_all_prerequisites
+        has_circular_dependency = prerequisite_service.has_circular_dependency
+        if label == "memory":
+            prerequisite_service.load_prerequisite_graph(db)
+    
+    # Adding a top course as a prerequisite of a bottom one is always a cycle,
+    # so the check has to search the whole chain below the top course
+    for name, operation in (
+        ("closure", lambda top_id, bottom_id: all_prerequisites(db, top_id)),
+        ("cycle check", lambda top_id, bottom_id: has_circular_dependency(db, bottom_id, top_id)),
+    ):
+        operation(*pairs[0])
+        latencies = []
+        sizes = []
+        for top_id, bottom_id in pairs:
+            start = time.perf_counter()
+            result = operation(top_id, bottom_id)
+            latencies.append(time.perf_counter() - start)
+            sizes.append(len(result) if isinstance(result, list) else int(result))
+            db.expunge_all()
+        print(
+            f"{label:>10} {name:>12} {statistics.median(latencies) * 1000:>9.2f} "
+            f"{percentile(latencies, 95) * 1000:>9.2f} {percentile(latencies, 99) * 1000:>9.2f} "
+            f"{statistics.mean(sizes):>9.0f}"
+        )
+
+
+def main(args: argparse.Namespace) -> None:
+    """Load data (unless skipped) and run the measurements."""
+    if SessionLocal is None:
+        raise SystemExit("DATABASE_URL is not configured")
+    
+    db = SessionLocal()
+    try:
+        if not args.skip_load:
+            if db.query(Department).filter(Department.code == BENCH_DEPT_CODE).first():
+                raise SystemExit("Benchmark data already loaded; pass --skip-load to reuse it")
+            print("Loading prerequisite graph...")
+            load_data(db, args)
+        
+        course_ids = [
+            row.id for row in db.query(Course.id).join(Department)
+            .filter(Department.code == BENCH_DEPT_CODE).order_by(Course.id)
+        ]
+        if not course_ids:
+            raise SystemExit("No benchmark data found; run without --skip-load first")
+        per_level = len(course_ids) // args.levels
+        top_ids = course_ids[:per_level]
+        bottom_ids = course_ids[(args.levels - 1) * per_level:args.levels * per_level]
+        
+        print(f"\n{'strategy':>10} {'operation':>12} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'result':>9}")
+        for label in args.strategies:
+            measure(db, label, top_ids, bottom_ids, args.samples)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark prerequisite closure and cycle checks on a deep graph")
+    parser.add_argument("--courses", type=int, default=2000)
+    parser.add_argument("--levels", type=int, default=10, help="Chain depth")
+    parser.add_argument("--fanout", type=int, default=3, help="Prerequisites per course")
+    parser.add_argument("--samples", type=int, default=20, help="Calls timed per operation")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-load", action="store_true", help="Reuse previously loaded benchmark data")
+    parser.add_argument(
+        "--strategies", nargs="+", choices=["per-node", "memory", "sql", "closure"],
+        default=["per-node", "memory", "sql", "closure"]
+    )
+    main(parser.parse_args())
@@ -0,0 +1,79 @@
+"""
+Bulk prerequisite import
+
+Reads prerequisite relationships from a CSV file with a header row
+`course_id,prerequisite_id` (one edge per row; `-` reads stdin) and adds them
+in one transaction. The whole file is checked against the existing graph
+first: unknown courses or circular dependencies are all reported and nothing
+is imported. Edges that already exist are skipped, so re-running an import is
+safe.
+
+Usage:
+    python scripts/import_prerequisites.py curriculum.csv
+    python scripts/import_prerequisites.py curriculum.csv --dry-run  # validate only
+"""
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.database import SessionLocal
+from app.schemas.prerequisite import PrerequisiteCreate
+from app.services import prerequisite_service
+
+
+def read_edges(path: str) -> list[PrerequisiteCreate]:
+    """Parse the CSV into prerequisite edges, exiting with a message on bad rows."""
+    handle = sys.stdin if path == "-" else open(path, newline="")
+    try:
+        reader = csv.DictReader(handle)
+        if not {"course_id", "prerequisite_id"} <= set(reader.fieldnames or []):
+            raise SystemExit("CSV header must contain course_id and prerequisite_id")
+        edges = []
+        for line_number, row in enumerate(reader, start=2):
+            try:
+                edges.append(PrerequisiteCreate(course_id=row["course_id"], prerequisite_id=row["prerequisite_id"]))
+            except ValidationError as e:
+                raise SystemExit(f"Line {line_number}: {e.errors()[0]['msg']}")
+        return edges
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def main(args: argparse.Namespace) -> int:
+    """Run the import. Returns the process exit code."""
+    if SessionLocal is None:
+        print("DATABASE_URL is not configured", file=sys.stderr)
+        return 1
+    
+    edges = read_edges(args.file)
+    if not edges:
+        print("No edges to import")
+        return 0
+    
+    db = SessionLocal()
+    try:
+        result = prerequisite_service.bulk_add_prerequisites(db, edges, dry_run=args.dry_run)
+    except HTTPException as e:
+        print(f"Import rejected: {e.detail}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+    
+    action = "imported" if result["committed"] else "would be imported (dry run)"
+    print(f"{result['created']} edge(s) {action}, {result['skipped']} already present or repeated")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add prerequisite relationships from a CSV file in one transaction")
+    parser.add_argument("file", help="CSV with course_id,prerequisite_id columns ('-' for stdin)")
+    parser.add_argument("--dry-run", action="store_true", help="Validate without importing")
+    sys.exit(main(parser.parse_args()))
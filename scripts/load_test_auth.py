@@ -0,0 +1,99 @@
+"""
+Authenticated endpoint load test
+
+Logs in once, then fires requests at an authenticated endpoint at several
+concurrency levels and reports latency percentiles for each level. Used to
+check that the auth dependency chain does not block the event loop: p99
+should stay roughly flat as concurrency grows, as long as the server has
+CPU to spare. Once it is saturated (e.g. one vCPU shared with this client),
+latency grows with the queue depth (concurrency / req/s) whatever the code
+does, so compare throughput and error counts across levels instead, or run
+the client on another machine.
+
+Usage:
+    python scripts/load_test_auth.py --email admin@example.com --password secret \
+        --base-url http://localhost:8000 --path /api/departments/ \
+        --concurrency 1 50 500 --requests 5000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the pct-th percentile of samples (nearest-rank)."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    """Return an access token for the given credentials."""
+    response = await client.post(
+        "/api/auth/login",
+        data={"username": email, "password": password},
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run_level(
+    client: httpx.AsyncClient, path: str, concurrency: int, total: int
+) -> tuple[list[float], int]:
+    """Send `total` requests with `concurrency` in flight. Returns (latencies, errors)."""
+    latencies: list[float] = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+
+async def main(args: argparse.Namespace):
+    """Run the load test at every requested concurrency level."""
+    max_concurrency = max(args.concurrency)
+    limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        token = await login(client, args.email, args.password)
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        print(f"{'conc':>6} {'reqs':>7} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+        for concurrency in args.concurrency:
+            start = time.perf_counter()
+            latencies, errors = await run_level(client, args.path, concurrency, args.requests)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{concurrency:>6} {len(latencies):>7} {errors:>5} "
+                f"{statistics.median(latencies) * 1000:>9.2f} "
+                f"{percentile(latencies, 95) * 1000:>9.2f} "
+                f"{percentile(latencies, 99) * 1000:>9.2f} "
+                f"{len(latencies) / elapsed:>9.0f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test an authenticated endpoint")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/api/departments/")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per concurrency level")
+    asyncio.run(main(parser.parse_args()))
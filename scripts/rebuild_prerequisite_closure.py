@@ -0,0 +1,43 @@
+"""
+Prerequisite closure rebuild
+
+Regenerates the course_prerequisite_closure table from course_prerequisites.
+The table is kept up to date on every prerequisite insert and delete; run
+this after loading edges outside the API (bulk SQL, restores) or to repair
+it. Prerequisite writes wait for the rebuild to finish.
+
+Usage:
+    python scripts/rebuild_prerequisite_closure.py
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.services import prerequisite_service
+
+
+def main(args: argparse.Namespace) -> int:
+    """Run the rebuild. Returns the process exit code."""
+    if SessionLocal is None:
+        print("DATABASE_URL is not configured", file=sys.stderr)
+        return 1
+    
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        rows = prerequisite_service.rebuild_closure(db)
+    finally:
+        db.close()
+    
+    print(f"Rebuilt course_prerequisite_closure: {rows} row(s) in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate course_prerequisite_closure from course_prerequisites")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,50 @@
+"""
+Enrolled count reconciliation
+
+Compares every course's stored enrolled_count with its active enrollments and
+repairs any drift. Safe to run while the API is serving traffic; schedule it
+(e.g. nightly cron) as a backstop for writes that bypassed the service layer.
+
+Usage:
+    python scripts/reconcile_enrolled_counts.py            # detect and repair
+    python scripts/reconcile_enrolled_counts.py --dry-run  # report only
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.services import enrollment_service
+
+
+def main(args: argparse.Namespace) -> int:
+    """Run the reconciliation. Returns the process exit code."""
+    if SessionLocal is None:
+        print("DATABASE_URL is not configured", file=sys.stderr)
+        return 1
+    
+    db = SessionLocal()
+    try:
+        drifted = enrollment_service.reconcile_enrolled_counts(db, repair=not args.dry_run)
+    finally:
+        db.close()
+    
+    for item in drifted:
+        print(
+            f"  {item['course_code']} (id {item['course_id']}): "
+            f"stored {item['stored_count']}, actual {item['actual_count']}"
+        )
+    action = "found" if args.dry_run else "repaired"
+    print(f"{len(drifted)} drifted course(s) {action}")
+    
+    # A dry run that finds drift exits non-zero so monitoring can alert on it
+    return 2 if args.dry_run and drifted else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Detect and repair drift in courses.enrolled_count")
+    parser.add_argument("--dry-run", action="store_true", help="Report drift without repairing it")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,142 @@
+"""
+Seat contention check
+
+Creates a course with a small number of seats and enough students to
+oversubscribe it, then fires one enrollment request per student at the same
+moment. Exactly `--seats` requests must succeed and every other one must be
+rejected with 409 "Course is full"; the course's availability must then show
+the course exactly full. Exits non-zero if seats were oversold or undersold.
+
+Run it against a running server backed by PostgreSQL (SQLite serializes all
+writers, so it cannot exercise the race):
+
+Usage:
+    python scripts/seat_contention_check.py --email admin@example.com --password secret \
+        --base-url http://localhost:8000 --seats 30 --requests 1000
+"""
+import argparse
+import asyncio
+import secrets
+import string
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    """Return an access token for the given credentials."""
+    response = await client.post(
+        "/api/auth/login",
+        data={"username": email, "password": password},
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def create_fixtures(client: httpx.AsyncClient, seats: int, students: int) -> tuple[int, list[int]]:
+    """Create a department, a course with `seats` seats and `students` students. Returns (course id, student ids)."""
+    # Department codes are letters only
+    suffix = "".join(secrets.choice(string.ascii_uppercase) for _ in range(6))
+
+    response = await client.post("/api/departments/", json={"code": f"SC{suffix}", "name": f"Seat Check {suffix}"})
+    response.raise_for_status()
+    department_id = response.json()["id"]
+
+    response = await client.post("/api/courses/", json={
+        "code": f"SEAT{suffix}",
+        "name": f"Seat Contention {suffix}",
+        "credits": 3,
+        "department_id": department_id,
+        "max_students": seats,
+        "semester": "Fall 2024",
+    })
+    response.raise_for_status()
+    course_id = response.json()["id"]
+
+    semaphore = asyncio.Semaphore(50)
+
+    async def create_student(index: int) -> int:
+        async with semaphore:
+            response = await client.post("/api/students/", json={
+                "student_number": f"SC{suffix}{index:05d}",
+                "name": f"Seat Check Student {index}",
+                "email": f"seatcheck-{suffix.lower()}-{index}@example.com",
+                "department_id": department_id,
+            })
+            response.raise_for_status()
+            return response.json()["id"]
+
+    student_ids = await asyncio.gather(*(create_student(i) for i in range(students)))
+    return course_id, list(student_ids)
+
+
+async def main(args: argparse.Namespace) -> int:
+    """Run the check. Returns the process exit code."""
+    limits = httpx.Limits(max_connections=args.requests, max_keepalive_connections=args.requests)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=120) as client:
+        token = await login(client, args.email, args.password)
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        print(f"Creating a {args.seats}-seat course and {args.requests} students...")
+        course_id, student_ids = await create_fixtures(client, args.seats, args.requests)
+
+        # Hold every request at the gate until all of them are ready to go
+        gate = asyncio.Event()
+
+        async def enroll(student_id: int) -> int:
+            await gate.wait()
+            try:
+                response = await client.post(
+                    "/api/enrollments/",
+                    json={"student_id": student_id, "course_id": course_id},
+                )
+                return response.status_code
+            except httpx.HTTPError:
+                return 0
+
+        tasks = [asyncio.create_task(enroll(student_id)) for student_id in student_ids]
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        gate.set()
+        statuses = Counter(await asyncio.gather(*tasks))
+        elapsed = time.perf_counter() - start
+
+        response = await client.get(f"/api/courses/{course_id}/availability")
+        response.raise_for_status()
+        availability = response.json()
+
+    print(f"Fired {args.requests} enrollments in {elapsed:.2f}s ({args.requests / elapsed:.0f} req/s)")
+    for status_code, count in sorted(statuses.items()):
+        label = "transport error" if status_code == 0 else f"HTTP {status_code}"
+        print(f"  {label}: {count}")
+    print(f"  availability: {availability['enrolled_count']}/{availability['max_students']} enrolled")
+
+    failures = []
+    if statuses[201] != args.seats:
+        failures.append(f"expected exactly {args.seats} successful enrollments, got {statuses[201]}")
+    if statuses[409] != args.requests - args.seats:
+        failures.append(f"expected {args.requests - args.seats} rejections (409), got {statuses[409]}")
+    if availability["enrolled_count"] != args.seats:
+        failures.append(f"course reports {availability['enrolled_count']} enrolled, expected {args.seats}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK: no seats oversold or lost")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fire simultaneous enrollments at one course and check seat accounting")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--seats", type=int, default=30)
+    parser.add_argument("--requests", type=int, default=1000, help="Students enrolling at once (must exceed --seats)")
+    args = parser.parse_args()
+    if args.requests <= args.seats:
+        parser.error("--requests must exceed --seats")
+    sys.exit(asyncio.run(main(args)))
@@ -10,6 +10,8 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from sqlalchemy.orm import Session
+from app.autocomplete import COURSES_VERSION_NAME
+from app.cache_versions import bump_version
 from app.database import SessionLocal
 from app.models import Department, Course
 
@@ -68,6 +70,9 @@ def seed_courses(db: Session, data: list[dict]) -> int:
         db.add(course)
         count += 1
     
+    if count:
+        # Running workers rebuild their autocomplete indexes
+        bump_version(db, COURSES_VERSION_NAME)
     db.commit()
     return count
 
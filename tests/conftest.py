@@ -0,0 +1,53 @@
+"""
+Shared test setup
+
+Settings are read when the app is imported, so the databases are chosen here
+first: a SQLite primary and a SQLite read replica in a temporary directory.
+The replica gets the schema but none of the primary's rows, which lets tests
+tell which database served a read.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+_database_dir = tempfile.mkdtemp(prefix="course-api-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_database_dir}/primary.db"
+os.environ["DATABASE_REPLICA_URLS"] = f"sqlite:///{_database_dir}/replica.db"
+os.environ["ASYNC_DATABASE"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import Base, SessionLocal, engine, replicas
+from app.main import app
+from app.models.user import UserRole
+from app.schemas.user import UserCreate
+from app.services import auth_service
+
+Base.metadata.create_all(engine)
+for replica in replicas.replicas:
+    Base.metadata.create_all(replica.engine)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """A TestClient for the app, with its lifespan running."""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def create_user():
+    """Factory creating a user on the primary; returns a bearer Authorization header for it."""
+    def create(email: str, role: UserRole) -> dict:
+        with SessionLocal() as db:
+            user = auth_service.create_user(
+                db, UserCreate(email=email, password="password1", role=role), auth_service.hash_password("password1")
+            )
+            token = auth_service.create_access_token(data=auth_service.build_token_claims(user))
+        return {"Authorization": f"Bearer {token}"}
+    
+    return create
@@ -0,0 +1,73 @@
+"""
+Read replica routing and read-your-writes
+
+The conftest's replica is an empty copy of the schema, so a department written
+through the API is only listed when the read was served by the primary.
+"""
+import pytest
+
+from app.middleware.read_your_writes import recent_writers
+from app.models.user import UserRole
+
+
+@pytest.fixture(autouse=True)
+def clear_stickiness(client):
+    """Start each test with no recent writers and no cookies."""
+    recent_writers.clear()
+    client.cookies.clear()
+    yield
+    recent_writers.clear()
+    client.cookies.clear()
+
+
+def _listed_codes(client, headers) -> set[str]:
+    response = client.get("/api/departments/", headers=headers)
+    assert response.status_code == 200, response.text
+    return {department["code"] for department in response.json()}
+
+
+def _create_department(client, headers, code: str) -> None:
+    response = client.post("/api/departments/", headers=headers, json={"code": code, "name": f"Department {code}"})
+    assert response.status_code == 201, response.text
+
+
+def test_reads_go_to_replica(client, create_user):
+    admin = create_user("replica-admin@example.com", UserRole.ADMIN)
+    _create_department(client, admin, "REPA")
+    recent_writers.clear()
+    client.cookies.clear()
+    
+    assert "REPA" not in _listed_codes(client, admin)
+
+
+def test_bearer_client_reads_own_write_without_cookie(client, create_user):
+    admin = create_user("bearer-admin@example.com", UserRole.ADMIN)
+    faculty = create_user("bearer-faculty@example.com", UserRole.FACULTY)
+    _create_department(client, admin, "REPB")
+    # A bearer-token client does not send the cookie back
+    client.cookies.clear()
+    
+    assert "REPB" in _listed_codes(client, admin)
+    # Other users are still served by the replica
+    assert "REPB" not in _listed_codes(client, faculty)
+
+
+def test_cookie_keeps_reads_on_primary(client, create_user):
+    admin = create_user("cookie-admin@example.com", UserRole.ADMIN)
+    _create_department(client, admin, "REPC")
+    recent_writers.clear()
+    
+    assert client.cookies.get("read_primary") == "1"
+    assert "REPC" in _listed_codes(client, admin)
+
+
+def test_failed_write_is_not_sticky(client, create_user):
+    admin = create_user("failed-admin@example.com", UserRole.ADMIN)
+    _create_department(client, admin, "REPD")
+    recent_writers.clear()
+    client.cookies.clear()
+    
+    response = client.post("/api/departments/", headers=admin, json={"code": "REPD", "name": "Department REPD"})
+    assert response.status_code == 409
+    client.cookies.clear()
+    assert "REPD" not in _listed_codes(client, admin)
@@ -0,0 +1,128 @@
+"""
+Concurrent enrollments must never oversell or lose a seat
+
+Fires more simultaneous create_enrollment calls than a course has seats, each
+on its own thread and session, and checks that exactly max_students succeed,
+every other call is rejected with 409 and the stored enrolled_count matches.
+
+Runs against a temporary SQLite database. Set TEST_POSTGRES_URL to also run it
+against PostgreSQL, where the row locks are actually contended (the schema is
+created if missing; fixtures use unique codes and are left in place).
+"""
+import os
+import secrets
+import string
+import threading
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Course, Department, Enrollment, Student
+from app.schemas.enrollment import EnrollmentCreate
+from app.services import enrollment_service
+
+SEATS = 30
+STUDENTS = 45
+
+BACKENDS = [
+    pytest.param("sqlite", id="sqlite"),
+    pytest.param(
+        "postgresql",
+        id="postgresql",
+        marks=pytest.mark.skipif(not os.environ.get("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL not set"),
+    ),
+]
+
+
+def _create_engine(backend: str, tmp_path):
+    """Create an engine with a connection per enrolling thread."""
+    if backend == "postgresql":
+        return create_engine(os.environ["TEST_POSTGRES_URL"], pool_size=STUDENTS, max_overflow=0)
+    
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/seats.db",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    
+    # SQLite allows one writer at a time. A deferred transaction that read
+    # first fails instead of waiting when another writer holds the lock, so
+    # take the write lock up front and let the busy timeout queue the threads.
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine, "begin")
+    def _begin_immediate(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+    
+    return engine
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_concurrent_enrollments_fill_course_exactly(backend, tmp_path):
+    engine = _create_engine(backend, tmp_path)
+    Base.metadata.create_all(engine)
+    SessionFactory = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+    
+    suffix = "".join(secrets.choice(string.ascii_uppercase) for _ in range(6))
+    with SessionFactory() as db:
+        department = Department(code=f"SC{suffix}", name=f"Seat Check {suffix}")
+        db.add(department)
+        db.flush()
+        course = Course(
+            code=f"SEAT{suffix}",
+            name=f"Seat Contention {suffix}",
+            credits=3,
+            department_id=department.id,
+            max_students=SEATS,
+            semester="Fall 2024",
+        )
+        students = [
+            Student(
+                student_number=f"SC{suffix}{index:05d}",
+                name=f"Seat Check Student {index}",
+                email=f"seatcheck-{suffix.lower()}-{index}@example.com",
+                department_id=department.id,
+            )
+            for index in range(STUDENTS)
+        ]
+        db.add(course)
+        db.add_all(students)
+        db.commit()
+        course_id = course.id
+        student_ids = [student.id for student in students]
+    
+    # Hold every thread at the barrier until all of them are ready to go
+    barrier = threading.Barrier(STUDENTS)
+    results: dict[int, int] = {}
+    
+    def enroll(student_id: int) -> None:
+        with SessionFactory() as db:
+            barrier.wait()
+            try:
+                enrollment_service.create_enrollment(db, EnrollmentCreate(student_id=student_id, course_id=course_id))
+                results[student_id] = 201
+            except HTTPException as exc:
+                db.rollback()
+                results[student_id] = exc.status_code
+    
+    threads = [threading.Thread(target=enroll, args=(student_id,)) for student_id in student_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    statuses = sorted(results.values())
+    assert len(statuses) == STUDENTS
+    assert statuses.count(201) == SEATS
+    assert statuses.count(409) == STUDENTS - SEATS
+    
+    with SessionFactory() as db:
+        assert db.get(Course, course_id).enrolled_count == SEATS
+        enrolled = db.query(Enrollment).filter(Enrollment.course_id == course_id, Enrollment.status == "enrolled").count()
+        assert enrolled == SEATS
+    
+    engine.dispose()